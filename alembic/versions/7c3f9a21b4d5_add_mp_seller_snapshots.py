@@ -0,0 +1,94 @@
+"""Add mp_seller_snapshots partitioned by day
+
+Revision ID: 7c3f9a21b4d5
+Revises: e1ed456386ac
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f9a21b4d5'
+down_revision: Union[str, None] = 'e1ed456386ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Секции по дням создаёт MPStatSellersORM.start_snapshot/append_snapshot
+    op.create_table(
+        'mp_seller_snapshots',
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('supplier_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('inn', sa.String(), nullable=True),
+        sa.Column('first_date', sa.Date(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('subjects', sa.Integer(), nullable=True),
+        sa.Column('subjects_with_sells', sa.Integer(), nullable=True),
+        sa.Column('subjects_with_sells_percent', sa.Float(), nullable=True),
+        sa.Column('items', sa.Integer(), nullable=True),
+        sa.Column('items_with_count', sa.Integer(), nullable=True),
+        sa.Column('items_with_sells', sa.Integer(), nullable=True),
+        sa.Column('items_with_sells_percent', sa.Float(), nullable=True),
+        sa.Column('live_items', sa.Integer(), nullable=True),
+        sa.Column('items_new', sa.Integer(), nullable=True),
+        sa.Column('items_new_percent', sa.Float(), nullable=True),
+        sa.Column('items_new_with_sells', sa.Integer(), nullable=True),
+        sa.Column('items_new_with_sells_percent', sa.Float(), nullable=True),
+        sa.Column('brands', sa.Integer(), nullable=True),
+        sa.Column('brands_with_sells', sa.Integer(), nullable=True),
+        sa.Column('brands_with_sells_percent', sa.Float(), nullable=True),
+        sa.Column('most_frequent_country', sa.String(), nullable=True),
+        sa.Column('sales', sa.BigInteger(), nullable=True),
+        sa.Column('balance', sa.Float(), nullable=True),
+        sa.Column('revenue', sa.Float(), nullable=True),
+        sa.Column('revenue_potential', sa.Float(), nullable=True),
+        sa.Column('lost_profit', sa.Float(), nullable=True),
+        sa.Column('lost_profit_percent', sa.Float(), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('min_price_with_sells', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.Column('max_price_with_sells', sa.Float(), nullable=True),
+        sa.Column('avg_price', sa.Float(), nullable=True),
+        sa.Column('avg_price_with_sells', sa.Float(), nullable=True),
+        sa.Column('median_price', sa.Float(), nullable=True),
+        sa.Column('median_price_with_sells', sa.Float(), nullable=True),
+        sa.Column('avg_rating', sa.Float(), nullable=True),
+        sa.Column('avg_rating_with_sells', sa.Float(), nullable=True),
+        sa.Column('turnover_in_days', sa.Integer(), nullable=True),
+        sa.Column('frozen_stocks', sa.BigInteger(), nullable=True),
+        sa.Column('frozen_stocks_cost', sa.Float(), nullable=True),
+        sa.Column('frozen_stocks_percent', sa.Float(), nullable=True),
+        sa.Column('purchase', sa.Float(), nullable=True),
+        sa.Column('purchase_after_return', sa.Float(), nullable=True),
+        sa.Column('sells_on_ozon', sa.Integer(), nullable=True),
+        sa.Column('wb_rating', sa.Float(), nullable=True),
+        sa.Column('wb_user_valuation', sa.Float(), nullable=True),
+        sa.Column('feedback_count', sa.Integer(), nullable=True),
+        sa.Column('delivery_duration', sa.Float(), nullable=True),
+        sa.Column('ratio_mark_supp', sa.Float(), nullable=True),
+        sa.Column('is_premium', sa.Boolean(), nullable=True),
+        sa.Column('supplier_loyalty_program_level', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('snapshot_date', 'supplier_id'),
+        schema='public',
+        postgresql_partition_by='RANGE (snapshot_date)',
+    )
+    op.create_index(
+        'ix_mp_seller_snapshots_supplier_date',
+        'mp_seller_snapshots',
+        ['supplier_id', 'snapshot_date'],
+        unique=False,
+        schema='public',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_mp_seller_snapshots_supplier_date', table_name='mp_seller_snapshots', schema='public')
+    op.drop_table('mp_seller_snapshots', schema='public')
@@ -0,0 +1,31 @@
+"""Add content_hash and missing_since to mp_sellers
+
+Revision ID: b52e8d0f6a13
+Revises: 7c3f9a21b4d5
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e8d0f6a13'
+down_revision: Union[str, None] = '7c3f9a21b4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонки без DEFAULT — добавление не переписывает таблицу; хэши заполнит первая загрузка
+    op.add_column('mp_sellers', sa.Column('content_hash', sa.BigInteger(), nullable=True), schema='public')
+    op.add_column('mp_sellers', sa.Column('missing_since', sa.Date(), nullable=True), schema='public')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('mp_sellers', 'missing_since', schema='public')
+    op.drop_column('mp_sellers', 'content_hash', schema='public')
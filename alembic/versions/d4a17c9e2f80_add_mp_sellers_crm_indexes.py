@@ -0,0 +1,73 @@
+"""Add CRM dashboard indexes and manager summary to mp_sellers
+
+Revision ID: d4a17c9e2f80
+Revises: b52e8d0f6a13
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a17c9e2f80'
+down_revision: Union[str, None] = 'b52e8d0f6a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# имя -> (колонки, условие частичного индекса)
+INDEXES = {
+    'ix_mp_sellers_manager_revenue': (['"Менеджер"', 'revenue DESC', 'supplier_id DESC'], 'revenue IS NOT NULL'),
+    'ix_mp_sellers_status_revenue': (['"Статус"', 'revenue DESC', 'supplier_id DESC'], 'revenue IS NOT NULL'),
+    'ix_mp_sellers_revenue': (['revenue DESC', 'supplier_id DESC'], 'revenue IS NOT NULL'),
+    'ix_mp_sellers_lost_profit': (['lost_profit DESC', 'supplier_id DESC'], 'lost_profit IS NOT NULL'),
+    'ix_mp_sellers_position': (['position', 'supplier_id'], 'position IS NOT NULL'),
+    'ix_mp_sellers_inn': (['inn'], 'inn IS NOT NULL'),
+}
+
+MANAGER_SUMMARY_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mp_sellers_manager_summary AS
+SELECT
+    COALESCE("Менеджер", '') AS manager,
+    COALESCE("Статус", '') AS status,
+    count(*) AS sellers,
+    sum(revenue) AS revenue,
+    avg(revenue) AS avg_revenue,
+    sum(lost_profit) AS lost_profit
+FROM public.mp_sellers
+WHERE missing_since IS NULL
+GROUP BY 1, 2
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись в mp_sellers, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, (columns, where) in INDEXES.items():
+            op.create_index(
+                name,
+                'mp_sellers',
+                [sa.text(column) for column in columns],
+                schema='public',
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+    op.execute(MANAGER_SUMMARY_SQL)
+    # уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_mp_sellers_manager_summary '
+        'ON public.mp_sellers_manager_summary (manager, status)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS public.mp_sellers_manager_summary')
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='mp_sellers', schema='public', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""Recreate suppliers table for Excel import and INN enrichment
+
+Revision ID: f3b9c61d7e24
+Revises: d4a17c9e2f80
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9c61d7e24'
+down_revision: Union[str, None] = 'd4a17c9e2f80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонки как в e1ed456386ac, даты регистрации и ликвидации — DateTime (их разбирает prepare_supplier_frame)
+    op.create_table('suppliers',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('inn', sa.String(), nullable=True),
+    sa.Column('Профиль на сайте Wildberries', sa.String(), nullable=True),
+    sa.Column('Название продавца', sa.String(), nullable=True),
+    sa.Column('Раздел товаров', sa.String(), nullable=True),
+    sa.Column('Категория товаров', sa.String(), nullable=True),
+    sa.Column('Товаров продано', sa.Integer(), nullable=True),
+    sa.Column('Количество отзывов', sa.Integer(), nullable=True),
+    sa.Column('Рейтинг продавца', sa.Float(), nullable=True),
+    sa.Column('% выкупленных товаров', sa.Float(), nullable=True),
+    sa.Column('Регистрация на Wildberries', sa.DateTime(), nullable=True),
+    sa.Column('Юридический адрес', sa.String(), nullable=True),
+    sa.Column('Рабочие телефоны мобильные', sa.String(), nullable=True),
+    sa.Column('Рабочие телефоны городские', sa.String(), nullable=True),
+    sa.Column('Рабочие Email', sa.String(), nullable=True),
+    sa.Column('Рабочие Email дополнительный источн', sa.String(), nullable=True),
+    sa.Column('Сайт', sa.String(), nullable=True),
+    sa.Column('Whatsapp', sa.String(), nullable=True),
+    sa.Column('Telegram', sa.String(), nullable=True),
+    sa.Column('VK', sa.String(), nullable=True),
+    sa.Column('Instagram', sa.String(), nullable=True),
+    sa.Column('OK', sa.String(), nullable=True),
+    sa.Column('Среднее количество продаваемых то', sa.Float(), nullable=True),
+    sa.Column('Статус компании', sa.String(), nullable=True),
+    sa.Column('Дата ликвидации', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name='suppliers_pkey'),
+    schema='public',
+    if_not_exists=True,
+    )
+    # Дедупликация импорта: ON CONFLICT DO NOTHING по профилю
+    op.create_index('uq_suppliers_wb_profile', 'suppliers', ['Профиль на сайте Wildberries'],
+                    unique=True, schema='public', if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_suppliers_wb_profile', table_name='suppliers', schema='public', if_exists=True)
+    op.drop_table('suppliers', schema='public')
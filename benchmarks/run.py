@@ -0,0 +1,362 @@
+"""
+Бенчмарки загрузки продавцов, upsert и импорта Excel на локальной заглушке MPStats.
+
+    python -m benchmarks.run --database-url postgresql+asyncpg://postgres@localhost/bench
+    python -m benchmarks.run --scenarios crawl,summary --compare benchmarks/results/<прошлый>.json
+
+Сценарии пишут в mp_sellers/suppliers указанной БД, поэтому по умолчанию разрешены
+только локальные адреса; сценарий import перед каждым файлом очищает suppliers.
+Результаты (строк/с, p50/p99, пик RSS) сохраняются в JSON. Заглушка работает в том же
+процессе и event loop, поэтому RSS и CPU в отчёте включают и её (см. STUB_NOTE).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+import aiohttp
+import pandas as pd
+from openpyxl import Workbook
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from benchmarks.stub_server import MPStatsStub
+from utils.logger import setup_logger
+from utils.metrics import mpstats_trace_config
+
+logger = setup_logger(__name__)
+
+SCENARIOS = ("crawl", "summary", "upsert", "pipeline", "import")
+LOCAL_HOSTS = (None, "", "localhost", "127.0.0.1", "::1")
+BENCH_DATE = "2025-01-01"
+STUB_NOTE = (
+    "Заглушка MPStats работает в том же процессе и event loop, что и бенчмарк: "
+    "peak_rss_mb, рост RSS и загрузка CPU включают её, а задержки — её очередь в event loop"
+)
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": None, "p99_ms": None}
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50_ms": round(pick(0.5) * 1000, 2), "p99_ms": round(pick(0.99) * 1000, 2)}
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        # нет /proc — только пик за всё время процесса
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def _measure(name: str, scenario: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Запускает сценарий, замеряя время и пик RSS (опрос /proc раз в 50 мс); ошибка попадает в результат"""
+    peak = _rss_mb()
+    baseline = peak
+
+    async def sample():
+        nonlocal peak
+        while True:
+            peak = max(peak, _rss_mb())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    try:
+        result = await scenario()
+    except Exception as e:
+        logger.error(f"❌ Сценарий {name} упал: {e!r}", exc_info=True)
+        result = {"error": repr(e)}
+    finally:
+        sampler.cancel()
+    elapsed = time.perf_counter() - started
+
+    result["elapsed_sec"] = round(elapsed, 3)
+    if "rows" in result and "error" not in result:
+        result["rows_per_sec"] = round(result["rows"] / elapsed, 1) if elapsed else None
+    result["peak_rss_mb"] = round(max(peak, _rss_mb()), 1)
+    result["rss_growth_mb"] = round(result["peak_rss_mb"] - baseline, 1)
+    logger.info(f"⏱️ {name}: {result}")
+    return result
+
+def _latency_trace(latencies: List[float]) -> aiohttp.TraceConfig:
+    """Точные задержки каждого запроса (гистограммы utils.metrics дают только границы корзин)"""
+
+    async def on_request_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_request_end(session, ctx, params):
+        latencies.append(time.perf_counter() - ctx.started)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+def _make_api(base_url: str, latencies: List[float], **kwargs):
+    from utils.seller_parcer_api import SellerParserAPI
+
+    api = SellerParserAPI(base_url, **kwargs)
+    api.session = aiohttp.ClientSession(trace_configs=[mpstats_trace_config(), _latency_trace(latencies)])
+    return api
+
+def make_supplier_excel(path: str, rows: int, seed: int = 42, start: int = 0) -> str:
+    """
+    Excel в формате выгрузки поставщиков (колонки SUPPLIER_EXCEL_COLUMNS), ~1% дублей профилей.
+    Профили — продавцы start..start + rows - 1, так что файлы с разными start не пересекаются.
+    """
+    from database.controller.ORM import SUPPLIER_EXCEL_COLUMNS, PROFILE_COLUMN
+
+    stub = MPStatsStub(seed=seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    header = list(SUPPLIER_EXCEL_COLUMNS)
+    sheet.append(header)
+    for i in range(start, start + rows):
+        seller_id = i if i % 100 else max(start, i - 1)
+        seller = stub.seller(seller_id)
+        values = {
+            "ИНН": seller["inn"],
+            PROFILE_COLUMN: f"https://www.wildberries.ru/seller/{seller_id}",
+            "Название продавца": seller["name"],
+            "Товаров продано": seller["sales"],
+            "Количество отзывов": seller["feedback_count"],
+            "Рейтинг продавца": seller["wb_rating"],
+            "Регистрация на Wildberries": seller["first_date"],
+            "Рабочие Email": f"seller{seller_id}@example.com",
+            "Статус компании": "Действующая",
+        }
+        sheet.append([values.get(column) for column in header])
+    workbook.save(path)
+    return path
+
+class BenchmarkRunner:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.stub = MPStatsStub(
+            total_sellers=args.sellers,
+            latency=args.latency,
+            jitter=args.latency / 2,
+            throttle_rate=args.throttle_rate,
+            error_rate=args.error_rate,
+            max_page_size=args.page_size,
+        )
+        self.base_url = ""
+
+    async def _reset_tables(self):
+        from database.entities.core import Base, Database
+
+        async with Database().async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("TRUNCATE public.mp_sellers"))
+
+    async def crawl(self) -> Dict:
+        latencies: List[float] = []
+        api = _make_api(self.base_url, latencies)
+        rows = 0
+        try:
+            async for page in api.iter_seller_pages(
+                BENCH_DATE, max_total=self.args.sellers, page_size=self.args.page_size, concurrency=self.args.concurrency
+            ):
+                rows += len(page)
+        finally:
+            await api.close()
+        return {"rows": rows, "requests": len(latencies), **_percentiles(latencies)}
+
+    async def summary(self) -> Dict:
+        from utils.seller_parcer_api import RequestScheduler
+
+        latencies: List[float] = []
+        scheduler = RequestScheduler(
+            max_concurrency=self.args.concurrency * 4, rate_per_sec=1000, base_delay=0.05, queue_delay=0.2, max_delay=2
+        )
+        api = _make_api(self.base_url, latencies, scheduler=scheduler)
+        rows = 0
+        try:
+            async for _, data in api.iter_seller_summaries(range(self.args.summaries)):
+                rows += bool(data)
+        finally:
+            await api.close()
+        return {"rows": rows, "requests": len(latencies), **_percentiles(latencies)}
+
+    async def upsert(self) -> Dict:
+        from database.controller.ORM import MPStatSellersORM, seller_to_row
+
+        await self._reset_tables()
+        orm = MPStatSellersORM()
+        rows = [seller_to_row(self.stub.seller(i)) for i in range(self.args.sellers)]
+        latencies = []
+        for pass_name in ("insert", "update"):
+            for start in range(0, len(rows), self.args.batch_size):
+                started = time.perf_counter()
+                await orm.upsert_sellers(rows[start:start + self.args.batch_size])
+                latencies.append(time.perf_counter() - started)
+        return {"rows": 2 * len(rows), "batches": len(latencies), **_percentiles(latencies)}
+
+    async def pipeline(self) -> Dict:
+        from database.controller.ORM import MPStatSellersORM
+
+        await self._reset_tables()
+        orm = MPStatSellersORM()
+        result = {}
+        for run_name, incremental in (("full", False), ("incremental", True)):
+            latencies: List[float] = []
+            api = _make_api(self.base_url, latencies)
+            try:
+                stats = await orm.refresh_from_api(
+                    api,
+                    BENCH_DATE,
+                    batch_size=self.args.batch_size,
+                    page_size=self.args.page_size,
+                    concurrency=self.args.concurrency,
+                    incremental=incremental,
+                )
+            finally:
+                await api.close()
+            result[run_name] = {**stats, **_percentiles(latencies)}
+        result["rows"] = result["full"]["rows"] + result["incremental"]["rows"]
+        return result
+
+    async def import_excel(self) -> Dict:
+        from database.controller.ORM import SuppliersORM
+        from database.entities.core import Database
+
+        orm = SuppliersORM()
+        await orm.ensure_tables()
+        result = {"rows": 0, "files": {}}
+        start = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in self.args.excel_sizes:
+                # Каждый файл — в пустую таблицу и со своими профилями: иначе строки уходят
+                # в ON CONFLICT DO NOTHING и замеряется пропуск, а не вставка
+                async with Database().async_engine.begin() as conn:
+                    await conn.execute(text("TRUNCATE public.suppliers RESTART IDENTITY"))
+                path = make_supplier_excel(os.path.join(tmp, f"suppliers_{size}.xlsx"), size, start=start)
+                start += size
+                started = time.perf_counter()
+                df = pd.read_excel(path)
+                read_sec = time.perf_counter() - started
+                await orm.import_from_excel(df, batch_size=self.args.import_batch_size)
+                elapsed = time.perf_counter() - started
+                async with Database().async_engine.begin() as conn:
+                    inserted = (await conn.execute(text("SELECT count(*) FROM public.suppliers"))).scalar()
+                result["files"][size] = {
+                    "read_sec": round(read_sec, 3),
+                    "elapsed_sec": round(elapsed, 3),
+                    "rows_per_sec": round(size / elapsed, 1),
+                    "inserted": inserted,
+                }
+                result["rows"] += size
+        return result
+
+    async def run(self) -> Dict:
+        self.base_url = await self.stub.start()
+        scenarios = {
+            "crawl": self.crawl,
+            "summary": self.summary,
+            "upsert": self.upsert,
+            "pipeline": self.pipeline,
+            "import": self.import_excel,
+        }
+        results = {}
+        try:
+            for name in self.args.scenarios:
+                self.stub.requests.clear()
+                results[name] = await _measure(name, scenarios[name])
+                results[name]["stub_requests"] = dict(self.stub.requests)
+        finally:
+            await self.stub.stop()
+            from database.entities.core import Database
+            await Database().dispose()
+        return results
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous: Dict, current: Dict) -> List[str]:
+    """Строки сравнения rows_per_sec / p99 / пика RSS с прошлым прогоном"""
+    lines = []
+    for name, result in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for key in ("rows_per_sec", "p99_ms", "peak_rss_mb"):
+            if result.get(key) and old.get(key):
+                change = (result[key] - old[key]) / old[key] * 100
+                lines.append(f"{name}.{key}: {old[key]} → {result[key]} ({change:+.1f}%)")
+    return lines
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки загрузки продавцов MPStats")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="БД для записи (asyncpg)")
+    parser.add_argument("--allow-remote", action="store_true", help="разрешить нелокальную БД")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda s: [x for x in s.split(",") if x])
+    parser.add_argument("--sellers", type=int, default=50_000)
+    parser.add_argument("--summaries", type=int, default=2_000)
+    parser.add_argument("--page-size", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--import-batch-size", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="средняя задержка заглушки, с")
+    parser.add_argument("--throttle-rate", type=float, default=0.01, help="доля ответов 202 «Ожидание очереди»")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument("--excel-sizes", default="1000,10000", type=lambda s: [int(x) for x in s.split(",") if x])
+    parser.add_argument("--output", default="benchmarks/results")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+    needs_db = {"upsert", "pipeline", "import"} & set(args.scenarios)
+    if needs_db:
+        if not args.database_url:
+            parser.error("для сценариев с записью нужен --database-url или BENCH_DATABASE_URL")
+        url = make_url(args.database_url)
+        socket_host = str(url.query.get("host", ""))
+        if url.host not in LOCAL_HOSTS and not socket_host.startswith("/") and not args.allow_remote:
+            parser.error(f"БД {url.host} не локальная — бенчмарк пишет в mp_sellers; добавьте --allow-remote")
+    return args
+
+async def main(argv: List[str] | None = None) -> Dict:
+    args = parse_args(argv)
+    if args.database_url:
+        # Database создаёт движок лениво, поэтому достаточно подменить окружение до первого запроса
+        os.environ["DATABASE_URL"] = args.database_url
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("database_url", "compare")},
+        "scenarios": await BenchmarkRunner(args).run(),
+        "notes": STUB_NOTE,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"💾 Результаты сохранены в {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            for line in compare(json.load(f), report):
+                logger.info(f"📊 {line}")
+    return report
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+import asyncio
+import random
+from collections import Counter
+from typing import Dict
+
+from aiohttp import web
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+QUEUE_MESSAGE = "Ожидание очереди"
+
+class MPStatsStub:
+    """
+    Локальная имитация MPStats для бенчмарков: /api/seller/list, /api/seller/summary
+    и /api/inn/by-seller-links. Данные детерминированы (seed), задержка ответа —
+    latency ± jitter секунд, с вероятностью throttle_rate отвечает 202 «Ожидание очереди»,
+    с вероятностью error_rate — 500. Страница списка обрезается до max_page_size строк.
+    """
+
+    def __init__(
+        self,
+        total_sellers: int = 100_000,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        max_page_size: int = 5000,
+        seed: int = 42,
+    ):
+        self.total_sellers = total_sellers
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()
+        self._runner: web.AppRunner | None = None
+
+    def seller(self, supplier_id: int) -> Dict:
+        rnd = random.Random(self.seed * 1_000_003 + supplier_id)
+        revenue = round(rnd.lognormvariate(12, 2), 2)
+        return {
+            "id": supplier_id,
+            "name": f"Продавец {supplier_id}",
+            "inn": str(7700000000 + supplier_id),
+            "first_date": f"20{rnd.randint(15, 24)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            "position": supplier_id + 1,
+            "items": rnd.randint(1, 5000),
+            "items_with_sells": rnd.randint(0, 1000),
+            "items_with_sells_percent": round(rnd.random() * 100, 2),
+            "brands": rnd.randint(1, 50),
+            "most_frequent_country": rnd.choice(("Китай", "Россия", "Турция", "Беларусь", "Киргизия")),
+            "sales": rnd.randint(0, 10 ** 6),
+            "balance": rnd.randint(0, 10 ** 5),
+            "revenue": revenue,
+            "lost_profit": round(revenue * rnd.random() / 5, 2),
+            "avg_price": round(rnd.uniform(100, 5000), 2),
+            "avg_rating": round(rnd.uniform(3, 5), 2),
+            "wb_rating": round(rnd.uniform(3, 5), 2),
+            "feedback_count": rnd.randint(0, 10 ** 5),
+            "is_premium": rnd.random() < 0.1,
+            "supplier_loyalty_program_level": rnd.randint(0, 5),
+        }
+
+    async def _delay(self) -> web.Response | None:
+        """Задержка и инъекция ошибок; None — отвечать нормально"""
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return web.Response(status=202, text=QUEUE_MESSAGE)
+        if roll < self.throttle_rate + self.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        return None
+
+    async def seller_list(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        start = int(body["startRow"])
+        end = min(int(body["endRow"]), start + self.max_page_size, self.total_sellers)
+        if (response := await self._delay()) is not None:
+            self.requests[f"list:{response.status}"] += 1
+            return response
+        self.requests["list:200"] += 1
+        return web.json_response({"data": [self.seller(i) for i in range(start, end)]})
+
+    async def seller_summary(self, request: web.Request) -> web.Response:
+        supplier_id = int(request.query["seller_id"])
+        if (response := await self._delay()) is not None:
+            self.requests[f"summary:{response.status}"] += 1
+            return response
+        self.requests["summary:200"] += 1
+        seller = self.seller(supplier_id)
+        return web.json_response({"revenue": seller["revenue"], "sales": seller["sales"], "balance": seller["balance"]})
+
+    async def inn_by_links(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if (response := await self._delay()) is not None:
+            self.requests[f"inn:{response.status}"] += 1
+            return response
+        self.requests["inn:200"] += 1
+        results = []
+        for link in body.get("links", []):
+            digits = "".join(ch for ch in link if ch.isdigit())
+            results.append({"link": link, "inn": str(7700000000 + int(digits)) if digits else None})
+        return web.json_response({"results": results})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускает сервер и возвращает base_url (port=0 — любой свободный порт)"""
+        app = web.Application(client_max_size=64 * 2 ** 20)
+        app.router.add_post("/api/seller/list", self.seller_list)
+        app.router.add_get("/api/seller/summary", self.seller_summary)
+        app.router.add_post("/api/inn/by-seller-links", self.inn_by_links)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"🧪 Заглушка MPStats запущена на {host}:{bound_port}")
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
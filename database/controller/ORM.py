@@ -2,35 +2,75 @@
 
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import inspect, text, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import inspect, text, select, update, delete, exists, func, tuple_, Table, BigInteger, Integer, Float, Date, Boolean
 from dotenv import load_dotenv
+from openpyxl import load_workbook
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Tuple
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from array import array
+import aiohttp
+import asyncio
 import functools
+import hashlib
+import math
+import os
+import resource
+import time
 import re
 
-from utils.seller_parcer_api import SellerParserAPI
+from utils.seller_parcer_api import SellerParserAPI, SELLER_LIST_CRAWL
+from utils.checkpoint import CrawlCheckpoint
 from utils.logger import setup_logger
+from utils.metrics import REGISTRY, DB_ROWS_WRITTEN, DB_TRANSACTION_SECONDS
 from database.entities.core import Database, Base
-from database.entities.models import MPStatSeller
+from database.entities.models import MPStatSeller, MPStatSellerSnapshot, Supplier, InnLookupFailure, CRM_FIELDS, SYNC_FIELDS
+from database.entities.seller_batch import SellerBatch, SELLER_FIELDS, SCALAR_COERCERS, decode_seller_page, to_date
 
 load_dotenv()
 logger = setup_logger(__name__)
 
+def _rows_written(result) -> int | None:
+    """Сколько строк записал метод — по его результату (число или статистика sync_sellers)"""
+    if isinstance(result, bool):
+        return None
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict) and "inserted" in result:
+        return result["inserted"] + result.get("updated", 0)
+    return None
+
 def session_manager(method):
     @functools.wraps(method)
     async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
         async with self.db.session() as session:
             async with session.begin():
                 try:
                     result = await method(self, session, *args, **kwargs)
                     await session.commit()
+                    DB_TRANSACTION_SECONDS.observe(time.perf_counter() - started, method=method.__qualname__, outcome="ok")
+                    if (rows := _rows_written(result)) is not None:
+                        DB_ROWS_WRITTEN.inc(rows, method=method.__qualname__)
                     logger.info(f"✅ {method.__name__} выполнена успешно")
                     return result
                 except Exception as e:
                     await session.rollback()
+                    DB_TRANSACTION_SECONDS.observe(time.perf_counter() - started, method=method.__qualname__, outcome="error")
                     logger.error(f"❌ Ошибка в {method.__name__}: {e}", exc_info=True)
                     raise e
     return wrapper
 
+DB_POOL = REGISTRY.gauge("db_pool", "Состояние пула соединений (Database.pool_stats)", ("stat",))
+
+def _collect_pool_stats():
+    for stat, value in Database().pool_stats().items():
+        DB_POOL.set(value, stat=stat)
+
+REGISTRY.add_collector(_collect_pool_stats)
+
 def clean_value(val, field=None):
     if pd.isna(val) or val == 'nan':
         return None
@@ -47,6 +87,93 @@ def clean_value(val, field=None):
                 return None
     return val
 
+# Заголовки выгрузки поставщиков → атрибуты Supplier
+PROFILE_COLUMN = "Профиль на сайте Wildberries"
+SUPPLIER_EXCEL_COLUMNS = {
+    "ИНН": "inn",
+    PROFILE_COLUMN: "wb_profile",
+    "Название продавца": "seller_name",
+    "Раздел товаров": "product_section",
+    "Категория товаров": "product_category",
+    "Товаров продано": "items_sold",
+    "Количество отзывов": "review_count",
+    "Рейтинг продавца": "seller_rating",
+    "% выкупленных товаров": "percent_purchased",
+    "Регистрация на Wildberries": "registration_date",
+    "Юридический адрес": "legal_address",
+    "Рабочие телефоны мобильные": "phone_mobile",
+    "Рабочие телефоны городские": "phone_city",
+    "Рабочие Email": "email",
+    "Рабочие Email дополнительный источник": "email_alt",
+    "Сайт": "website",
+    "Whatsapp": "whatsapp",
+    "Telegram": "telegram",
+    "VK": "vk",
+    "Instagram": "instagram",
+    "OK": "ok",
+    "Среднее количество продаваемых товаров в день": "avg_sales_per_day",
+    "Статус компании": "company_status",
+    "Дата ликвидации": "liquidation_date",
+}
+SUPPLIER_DATE_FIELDS = ("registration_date", "liquidation_date")
+
+def _supplier_text(val) -> str:
+    # ИНН и телефоны Excel отдаёт числами: 7701234567 (или 7701234567.0 при пропусках в колонке)
+    if isinstance(val, float) and val.is_integer():
+        return str(int(val))
+    return str(val)
+
+def prepare_supplier_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Векторная версия clean_value для целой выгрузки: колонки переименовываются в атрибуты Supplier,
+    даты разбираются с errors='coerce' (значения с латиницей считаются мусором),
+    числовые колонки приводятся к числам, текстовые — к строкам, NaN/'nan' превращаются в None.
+    """
+    frame = df.reindex(columns=list(SUPPLIER_EXCEL_COLUMNS)).rename(columns=SUPPLIER_EXCEL_COLUMNS)
+
+    for field in SUPPLIER_DATE_FIELDS:
+        column = frame[field]
+        if not pd.api.types.is_datetime64_any_dtype(column):
+            as_text = column.astype("string")
+            junk = as_text.str.contains(r"[A-Za-z]{2,}", na=False)
+            column = pd.to_datetime(as_text.mask(junk), errors="coerce", format="mixed")
+        frame[field] = column
+
+    for field, column in Supplier.__mapper__.columns.items():
+        if field not in frame.columns or field in SUPPLIER_DATE_FIELDS:
+            continue
+        if isinstance(column.type, Integer):
+            frame[field] = pd.to_numeric(frame[field], errors="coerce").round().astype("Int64")
+        elif isinstance(column.type, Float):
+            frame[field] = pd.to_numeric(frame[field], errors="coerce")
+        else:
+            frame[field] = frame[field].map(_supplier_text, na_action="ignore")
+
+    frame = frame.astype(object)
+    return frame.where(frame.notna() & (frame != "nan"), None)
+
+def iter_supplier_file(path: str, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+    """
+    Построчно читает выгрузку поставщиков (.xlsx в read-only режиме openpyxl или .csv)
+    и отдаёт её кусками по chunk_size строк, не загружая файл целиком.
+    """
+    if path.lower().endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while chunk := list(islice(rows, chunk_size)):
+            yield pd.DataFrame.from_records(chunk, columns=header)
+    finally:
+        workbook.close()
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss в Linux — в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 class SuppliersORM:
     def __init__(self, db: Database = Database()):
         self.db = db
@@ -62,71 +189,117 @@ class SuppliersORM:
 
             if "suppliers" not in tables:
                 logger.info("📂 Таблица 'suppliers' не найдена. Создаём...")
-                await conn.run_sync(Base.metadata.create_all)
-                logger.info("✅ Таблица 'suppliers' успешно создана")
             else:
-                logger.info("📁 Таблица 'suppliers' уже существует — пропускаем создание")
+                logger.info("📁 Таблица 'suppliers' уже существует — создаём только недостающие таблицы")
+            # checkfirst: создаются только отсутствующие таблицы (mp_sellers, inn_lookup_failures, ...)
+            await conn.run_sync(Base.metadata.create_all)
 
-    async def import_from_excel(self, df: pd.DataFrame, batch_size: int = 100):
-        if "Профиль на сайте Wildberries" not in df.columns:
-            logger.error("❌ В таблице отсутствует колонка 'Профиль на сайте Wildberries'")
+            # У таблицы, созданной до появления индекса, create_all его не добавит
+            for index in Supplier.__table__.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+            logger.info("✅ Таблицы поставщиков готовы")
+
+    async def import_from_excel(self, df: pd.DataFrame, batch_size: int = 100, dedupe_in_file: bool = True):
+        if PROFILE_COLUMN not in df.columns:
+            logger.error(f"❌ В таблице отсутствует колонка '{PROFILE_COLUMN}'")
             return
 
-        profile_column = "Профиль на сайте Wildberries"
-        total = len(df)
-        added, skipped = 0, 0
+        seen = set() if dedupe_in_file else None
+        added, skipped = await self._import_frame(prepare_supplier_frame(df), batch_size, seen=seen)
+        logger.info(f"🎉 Импорт завершён: всего добавлено {added}, пропущено {skipped}")
+
+    async def import_from_file(
+        self,
+        path: str,
+        batch_size: int = 100,
+        read_chunk_size: int = 10000,
+        dedupe_in_file: bool = True,
+        executor: Executor | None = None,
+    ):
+        """
+        Импорт выгрузки поставщиков прямо из файла (.xlsx/.csv).
+        Файл читается кусками по read_chunk_size строк в отдельном потоке,
+        так что пиковая память зависит от размера куска, а не файла.
+        С executor (например, ProcessPoolExecutor) очистка кусков идёт вне event loop.
+        """
+        chunks = iter_supplier_file(path, read_chunk_size)
+        seen = set() if dedupe_in_file else None
+        added, skipped, batches = 0, 0, 0
+
+        try:
+            while True:
+                started = time.perf_counter()
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+
+                if PROFILE_COLUMN not in chunk.columns:
+                    logger.error(f"❌ В файле {path} отсутствует колонка '{PROFILE_COLUMN}'")
+                    return
 
-        for i in range(0, total, batch_size):
-            chunk = df.iloc[i:i + batch_size]
-            async with self.db.session() as session:
-                existing_profiles = await self._get_existing_profiles(session, chunk[profile_column].tolist())
-
-                new_objects = []
-                for _, row in chunk.iterrows():
-                    profile = clean_value(row.get(profile_column))
-                    if profile in existing_profiles:
-                        skipped += 1
-                        continue
-
-                    obj = Supplier(
-                        inn=clean_value(row.get("ИНН")),
-                        wb_profile=profile,
-                        seller_name=clean_value(row.get("Название продавца")),
-                        product_section=clean_value(row.get("Раздел товаров")),
-                        product_category=clean_value(row.get("Категория товаров")),
-                        items_sold=clean_value(row.get("Товаров продано")),
-                        review_count=clean_value(row.get("Количество отзывов")),
-                        seller_rating=clean_value(row.get("Рейтинг продавца")),
-                        percent_purchased=clean_value(row.get("% выкупленных товаров")),
-                        registration_date=clean_value(row.get("Регистрация на Wildberries"), field="registration_date"),
-                        legal_address=clean_value(row.get("Юридический адрес")),
-                        phone_mobile=clean_value(row.get("Рабочие телефоны мобильные")),
-                        phone_city=clean_value(row.get("Рабочие телефоны городские")),
-                        email=clean_value(row.get("Рабочие Email")),
-                        email_alt=clean_value(row.get("Рабочие Email дополнительный источник")),
-                        website=clean_value(row.get("Сайт")),
-                        whatsapp=clean_value(row.get("Whatsapp")),
-                        telegram=clean_value(row.get("Telegram")),
-                        vk=clean_value(row.get("VK")),
-                        instagram=clean_value(row.get("Instagram")),
-                        ok=clean_value(row.get("OK")),
-                        avg_sales_per_day=clean_value(row.get("Среднее количество продаваемых товаров в день")),
-                        company_status=clean_value(row.get("Статус компании")),
-                        liquidation_date=clean_value(row.get("Дата ликвидации"), field="liquidation_date")
-                    )
-                    new_objects.append(obj)
-
-                session.add_all(new_objects)
-                await session.commit()
-                added += len(new_objects)
                 logger.info(
-                    f"🔹 Пакет {i // batch_size + 1}: добавлено {len(new_objects)}, пропущено {len(chunk) - len(new_objects)}")
+                    f"📥 Прочитано {len(chunk)} строк за {time.perf_counter() - started:.2f} с: "
+                    f"кусок {chunk.memory_usage(deep=True).sum() / 2 ** 20:.1f} МБ, "
+                    f"пик памяти процесса {_peak_rss_mb():.0f} МБ"
+                )
+                if executor is not None:
+                    frame = await asyncio.get_running_loop().run_in_executor(executor, prepare_supplier_frame, chunk)
+                else:
+                    frame = prepare_supplier_frame(chunk)
+                chunk_added, chunk_skipped = await self._import_frame(
+                    frame, batch_size, batch_offset=batches, seen=seen
+                )
+                added += chunk_added
+                skipped += chunk_skipped
+                batches += math.ceil(len(chunk) / batch_size)
+        finally:
+            await asyncio.to_thread(chunks.close)
 
-        logger.info(f"🎉 Импорт завершён: всего добавлено {added}, пропущено {skipped}")
+        logger.info(f"🎉 Импорт {path} завершён: всего добавлено {added}, пропущено {skipped}")
+
+    async def _import_frame(
+        self, frame: pd.DataFrame, batch_size: int, batch_offset: int = 0, seen: set | None = None
+    ) -> Tuple[int, int]:
+        """
+        Пакетная вставка уже очищенного кадра (см. prepare_supplier_frame).
+        Дубликаты по профилю отсекает сама БД: INSERT ... ON CONFLICT DO NOTHING RETURNING
+        по уникальному индексу на wb_profile (создаётся в ensure_tables).
+        seen — необязательный набор уже встреченных в файле профилей, чтобы не слать повторы в БД.
+        """
+        fields = list(frame.columns)
+        profile_idx = fields.index("wb_profile")
+        stmt = (
+            pg_insert(Supplier)
+            .on_conflict_do_nothing(index_elements=[Supplier.wb_profile])
+            .returning(Supplier.wb_profile)
+        )
+        added, skipped = 0, 0
+
+        for i in range(0, len(frame), batch_size):
+            rows = list(frame.iloc[i:i + batch_size].itertuples(index=False, name=None))
+            if seen is not None:
+                unique_rows = []
+                for row in rows:
+                    profile = row[profile_idx]
+                    if profile is None or profile not in seen:
+                        seen.add(profile)
+                        unique_rows.append(row)
+            else:
+                unique_rows = rows
+
+            inserted = 0
+            if unique_rows:
+                async with self.db.session() as session:
+                    result = await session.execute(stmt, [dict(zip(fields, row)) for row in unique_rows])
+                    inserted = len(result.all())
+                    await session.commit()
+
+            added += inserted
+            skipped += len(rows) - inserted
+            logger.info(
+                f"🔹 Пакет {batch_offset + i // batch_size + 1}: добавлено {inserted}, пропущено {len(rows) - inserted}")
 
-    async def _get_existing_profiles(self, session: AsyncSession, profiles: list[str]) -> set:
-        result = await session.execute(select(Supplier.wb_profile).where(Supplier.wb_profile.in_(profiles)))
-        return set(row[0] for row in result.all())
+        return added, skipped
 
     async def update_missing_inns_once(self, api: SellerParserAPI, batch_size: int = 100) -> bool:
         async with self.db.session() as session:
@@ -162,3 +335,767 @@ class SuppliersORM:
             await session.commit()
             logger.info(f"🔄 Обновлено {updated} ИНН из {len(suppliers_batch)}")
             return True
+
+    async def run_inn_enrichment(
+        self,
+        api: SellerParserAPI,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        retry_failed_after: float = 6 * 3600,
+        idle_sleep: float | None = None,
+    ) -> Dict[str, int]:
+        """
+        Долгоживущее заполнение ИНН. concurrency воркеров параллельно берут пачки поставщиков
+        без ИНН через SELECT ... FOR UPDATE SKIP LOCKED, двигаясь по id (keyset), и держат
+        одновременно до concurrency запросов fetch_inns_by_links. Благодаря SKIP LOCKED можно
+        запускать сколько угодно процессов и хостов — они не возьмут одни и те же строки.
+        Ссылки, для которых MPStats ответил без ИНН, записываются в inn_lookup_failures и не
+        запрашиваются повторно раньше чем через retry_failed_after секунд. При сетевой или
+        HTTP-ошибке пачка откатывается (строки освобождаются и будут взяты снова), а воркер
+        делает паузу api.scheduler.backoff, растущую при ошибках подряд.
+        Без idle_sleep воркеры завершаются, когда брать больше нечего, иначе ждут новые строки.
+        """
+        stats = {"batches": 0, "checked": 0, "updated": 0, "failed": 0, "errors": 0}
+        cursor = {"id": 0}
+        claim_lock = asyncio.Lock()
+        started = time.perf_counter()
+
+        async def claim(session: AsyncSession) -> list:
+            async with claim_lock:
+                batch = await self._claim_inn_batch(session, cursor["id"], batch_size)
+                if not batch and cursor["id"]:
+                    # Дошли до конца таблицы — начинаем новый круг с начала
+                    cursor["id"] = 0
+                    batch = await self._claim_inn_batch(session, 0, batch_size)
+                if batch:
+                    cursor["id"] = batch[-1].id
+                return batch
+
+        async def worker():
+            errors_in_row = 0
+            while True:
+                batch = []
+                try:
+                    async with self.db.session() as session:
+                        async with session.begin():
+                            batch = await claim(session)
+                            if batch:
+                                updated, failed = await self._enrich_inn_batch(session, api, batch, retry_failed_after)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Транзакция откатилась: блокировки сняты, в inn_lookup_failures ничего не записано.
+                    # Курсор возвращаем к началу пачки, чтобы после паузы взять её снова
+                    if batch:
+                        cursor["id"] = min(cursor["id"], batch[0].id - 1)
+                    delay = api.scheduler.backoff(errors_in_row)
+                    errors_in_row += 1
+                    stats["errors"] += 1
+                    logger.warning(f"⚠️ ИНН: MPStats недоступен ({type(e).__name__}: {e}), пауза {delay:.1f} с")
+                    await asyncio.sleep(delay)
+                    continue
+                errors_in_row = 0
+
+                if not batch:
+                    if idle_sleep is None:
+                        return
+                    await asyncio.sleep(idle_sleep)
+                    continue
+
+                stats["batches"] += 1
+                stats["checked"] += len(batch)
+                stats["updated"] += updated
+                stats["failed"] += failed
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"🔄 ИНН: пачка {stats['batches']} — обновлено {updated} из {len(batch)}; "
+                    f"всего проверено {stats['checked']}, обновлено {stats['updated']}, без ответа {stats['failed']} "
+                    f"({stats['checked'] / elapsed:.1f} ссылок/с)"
+                )
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        logger.info(f"🟢 Заполнение ИНН завершено: {stats}")
+        return stats
+
+    async def _claim_inn_batch(self, session: AsyncSession, after_id: int, batch_size: int) -> list:
+        recently_failed = exists().where(
+            InnLookupFailure.wb_profile == Supplier.wb_profile,
+            InnLookupFailure.retry_after > func.now(),
+        )
+        stmt = (
+            select(Supplier.id, Supplier.wb_profile)
+            .where(
+                Supplier.id > after_id,
+                Supplier.wb_profile.is_not(None),
+                Supplier.inn.is_(None),
+                ~recently_failed,
+            )
+            .order_by(Supplier.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True, of=Supplier)
+        )
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def _enrich_inn_batch(
+        self, session: AsyncSession, api: SellerParserAPI, batch: list, retry_failed_after: float
+    ) -> Tuple[int, int]:
+        links = list({row.wb_profile for row in batch})
+        # Ошибки запроса пробрасываются и откатывают пачку — провалом считается только ответ без ИНН
+        inns_data = await api.fetch_inns_by_links(links)
+        link_to_inn = {entry['link']: entry['inn'] for entry in inns_data if entry.get('inn')}
+
+        updates = [{"id": row.id, "inn": link_to_inn[row.wb_profile]} for row in batch if row.wb_profile in link_to_inn]
+        if updates:
+            await session.execute(update(Supplier), updates)
+            await session.execute(delete(InnLookupFailure).where(InnLookupFailure.wb_profile.in_(list(link_to_inn))))
+
+        failed = [link for link in links if link not in link_to_inn]
+        if failed:
+            retry_after = datetime.now(timezone.utc) + timedelta(seconds=retry_failed_after)
+            stmt = pg_insert(InnLookupFailure).values(
+                [{"wb_profile": link, "attempts": 1, "retry_after": retry_after} for link in failed]
+            )
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[InnLookupFailure.wb_profile],
+                set_={"attempts": InnLookupFailure.attempts + 1, "retry_after": stmt.excluded.retry_after},
+            ))
+
+        return len(updates), len(failed)
+
+_MPSTAT_SELLER_FIELDS = [(key, json_keys, SCALAR_COERCERS[kind]) for key, json_keys, kind in SELLER_FIELDS]
+
+def seller_to_row(item: Dict) -> Dict:
+    """Переводит продавца из ответа MPStats в словарь атрибутов MPStatSeller с нужными типами"""
+    row = {}
+    for key, json_keys, coerce in _MPSTAT_SELLER_FIELDS:
+        val = next((item[k] for k in json_keys if item.get(k) is not None), None)
+        if val is None or val == "":
+            row[key] = None
+            continue
+        try:
+            row[key] = coerce(val)
+        except (TypeError, ValueError):
+            row[key] = None
+    return row
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, BigInteger):
+        return pa.int64()
+    if isinstance(column.type, Integer):
+        return pa.int32()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    return pa.string()
+
+def _parquet_writer(path: str, keys: List[str]):
+    # pyarrow нужен только для выгрузки в Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = MPStatSeller.__mapper__.columns
+    schema = pa.schema([(key, _arrow_type(columns[key])) for key in keys])
+    return pq.ParquetWriter(path, schema, compression="zstd")
+
+def _write_parquet_chunk(writer, keys: List[str], rows: List[tuple]):
+    import pyarrow as pa
+
+    # Схема задана заранее — типы не «плавают» между row group, даже если колонка в куске пустая
+    values = list(zip(*rows)) if rows else [()] * len(keys)
+    arrays = [pa.array(column, type=field.type) for column, field in zip(values, writer.schema)]
+    writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+
+def _content_hash(record: tuple) -> int:
+    """64-битный хэш значений продавца из MPStats (знаковый — под BIGINT)"""
+    digest = hashlib.blake2b(repr(record).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+# Метрики, по которым find_sellers сортирует с keyset-пагинацией: метрика -> по убыванию
+SELLER_SORT_KEYS = {"revenue": True, "lost_profit": True, "position": False}
+
+# Материализованная сводка mp_sellers по менеджерам и статусам (создаётся миграцией)
+MANAGER_SUMMARY_VIEW = "mp_sellers_manager_summary"
+
+class MPStatSellersORM:
+    def __init__(self, db: Database = Database()):
+        self.db = db
+
+    @staticmethod
+    def _upsert_columns() -> List[Tuple[str, str]]:
+        """Пары (атрибут модели, колонка в БД) для всех полей из MPStats — без CRM и служебных"""
+        return [
+            (key, column.name)
+            for key, column in MPStatSeller.__mapper__.columns.items()
+            if key not in CRM_FIELDS + SYNC_FIELDS
+        ]
+
+    def _seller_records(self, rows: Iterable[dict] | SellerBatch) -> Tuple[List[str], List[tuple]]:
+        """
+        Колонки и строки для COPY в mp_sellers: поля MPStats, их content_hash
+        и сброшенный missing_since (продавец снова есть в списке)
+        """
+        columns = self._upsert_columns()
+        keys = [key for key, _ in columns]
+        if isinstance(rows, SellerBatch):
+            source = rows.records(keys)
+        else:
+            source = (tuple(row.get(key) for key in keys) for row in rows)
+        records = [(*record, _content_hash(record), None) for record in source]
+        return [name for _, name in columns] + ["content_hash", "missing_since"], records
+
+    @session_manager
+    async def upsert_sellers(self, session: AsyncSession, rows: Iterable[dict]) -> int:
+        """
+        Массовый upsert продавцов в mp_sellers.
+        rows — словари с ключами-атрибутами MPStatSeller и уже приведёнными типами.
+        Строки заливаются через COPY во временную таблицу и сливаются в mp_sellers
+        одним INSERT ... ON CONFLICT (supplier_id) DO UPDATE, CRM-колонки не перезаписываются.
+        """
+        column_names, records = self._seller_records(rows)
+        if not records:
+            return 0
+        return await self._copy_and_merge(session, column_names, records)
+
+    @session_manager
+    async def upsert_batch(self, session: AsyncSession, batch: SellerBatch) -> int:
+        """То же, что upsert_sellers, но для колоночного SellerBatch — без промежуточных словарей"""
+        if not len(batch):
+            return 0
+        column_names, records = self._seller_records(batch)
+        return await self._copy_and_merge(session, column_names, records)
+
+    @session_manager
+    async def sync_sellers(self, session: AsyncSession, rows: Iterable[dict] | SellerBatch) -> Dict[str, int]:
+        """
+        Инкрементальный вариант upsert_sellers/upsert_batch: пишутся только новые продавцы
+        и те, у кого изменился content_hash (или кто вернулся после missing_since).
+        Неизменившиеся строки mp_sellers не переписываются — ни WAL, ни новых версий строк и индексов.
+        """
+        stats = {"unchanged": 0, "updated": 0, "inserted": 0}
+        column_names, records = self._seller_records(rows)
+        if not records:
+            return stats
+
+        table = MPStatSeller.__table__
+        stage = await self._copy_to_stage(session, table, column_names, records)
+        # Отсев по хэшу делается в temp-таблице, которая не пишется в WAL
+        result = await session.execute(text(
+            f'DELETE FROM "{stage}" AS s USING {table.schema}.{table.name} AS m '
+            f'WHERE m."supplier_id" = s."supplier_id" AND m."content_hash" = s."content_hash" '
+            f'AND m."missing_since" IS NULL'
+        ))
+        stats["unchanged"] = result.rowcount
+
+        merge = self._merge_sql(table, stage, column_names, ("supplier_id",), update=True)
+        result = await session.execute(text(
+            f"WITH merged AS ({merge} RETURNING (xmax = 0) AS inserted) "
+            f"SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+        ))
+        stats["inserted"], stats["updated"] = result.one()
+        await session.execute(text(f'DROP TABLE "{stage}"'))
+        return stats
+
+    @session_manager
+    async def mark_missing_sellers(self, session: AsyncSession, seen_ids: Iterable[int], day: date) -> int:
+        """
+        Проставляет missing_since = day продавцам mp_sellers, которых нет в seen_ids.
+        Вызывать только после полного обхода списка, иначе пропавшими окажутся недокачанные продавцы.
+        """
+        stage = "_seen_mp_sellers"
+        await session.execute(text(f'CREATE TEMP TABLE "{stage}" ("supplier_id" integer) ON COMMIT DROP'))
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            stage, records=((supplier_id,) for supplier_id in seen_ids), columns=["supplier_id"]
+        )
+        await session.execute(text(f'ANALYZE "{stage}"'))
+
+        table = MPStatSeller.__table__
+        result = await session.execute(text(
+            f'UPDATE {table.schema}.{table.name} AS m SET "missing_since" = :day '
+            f'WHERE m."missing_since" IS NULL '
+            f'AND NOT EXISTS (SELECT 1 FROM "{stage}" AS s WHERE s."supplier_id" = m."supplier_id")'
+        ), {"day": day})
+        await session.execute(text(f'DROP TABLE "{stage}"'))
+        logger.info(f"👻 Пропавших из списка MPStats продавцов за {day}: {result.rowcount}")
+        return result.rowcount
+
+    @classmethod
+    async def _copy_and_merge(
+        cls,
+        session: AsyncSession,
+        column_names: List[str],
+        records: List[tuple],
+        table: Table = MPStatSeller.__table__,
+        conflict_keys: Tuple[str, ...] = ("supplier_id",),
+        update: bool = True,
+    ) -> int:
+        """COPY во временную таблицу и слияние в table; без update конфликтующие строки пропускаются"""
+        stage = await cls._copy_to_stage(session, table, column_names, records)
+        result = await session.execute(text(cls._merge_sql(table, stage, column_names, conflict_keys, update)))
+        await session.execute(text(f'DROP TABLE "{stage}"'))
+        return result.rowcount
+
+    @staticmethod
+    async def _copy_to_stage(session: AsyncSession, table: Table, column_names: List[str], records: List[tuple]) -> str:
+        stage = f"_stage_{table.name}"
+        await session.execute(text(
+            f'CREATE TEMP TABLE "{stage}" (LIKE {table.schema}.{table.name} INCLUDING DEFAULTS) ON COMMIT DROP'
+        ))
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(stage, records=records, columns=column_names)
+        return stage
+
+    @staticmethod
+    def _merge_sql(
+        table: Table, stage: str, column_names: List[str], conflict_keys: Tuple[str, ...], update: bool
+    ) -> str:
+        quoted = ", ".join(f'"{name}"' for name in column_names)
+        keys = ", ".join(f'"{name}"' for name in conflict_keys)
+        if update:
+            updates = ", ".join(f'"{name}" = EXCLUDED."{name}"' for name in column_names if name not in conflict_keys)
+            on_conflict = f"DO UPDATE SET {updates}"
+        else:
+            on_conflict = "DO NOTHING"
+        # DISTINCT ON — в одной пачке один supplier_id может встретиться дважды,
+        # а ON CONFLICT не умеет обновлять одну строку два раза за запрос
+        return (
+            f'INSERT INTO {table.schema}.{table.name} ({quoted}) '
+            f'SELECT DISTINCT ON ({keys}) {quoted} FROM "{stage}" ORDER BY {keys} '
+            f'ON CONFLICT ({keys}) {on_conflict}'
+        )
+
+    @staticmethod
+    async def _ensure_snapshot_partition(session: AsyncSession, day: date) -> str:
+        table = MPStatSellerSnapshot.__table__
+        partition = f"{table.name}_{day:%Y%m%d}"
+        await session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table.schema}.{partition} PARTITION OF {table.schema}.{table.name} "
+            f"FOR VALUES FROM ('{day}') TO ('{day + timedelta(days=1)}')"
+        ))
+        return partition
+
+    @session_manager
+    async def start_snapshot(self, session: AsyncSession, day: date, overwrite: bool = True):
+        """Создаёт секцию mp_seller_snapshots за день; с overwrite очищает её, если день загружается заново"""
+        partition = await self._ensure_snapshot_partition(session, day)
+        if overwrite:
+            await session.execute(text(f"TRUNCATE {MPStatSellerSnapshot.__table__.schema}.{partition}"))
+
+    @session_manager
+    async def append_snapshot(self, session: AsyncSession, day: date, rows: Iterable[dict] | SellerBatch) -> int:
+        """
+        Дописывает продавцов в снимок за день (COPY, секция создаётся при необходимости).
+        Уже записанные за этот день supplier_id пропускаются, так что повтор пачки безопасен.
+        """
+        await self._ensure_snapshot_partition(session, day)
+        columns = self._upsert_columns()
+        keys = [key for key, _ in columns]
+        if isinstance(rows, SellerBatch):
+            source = rows.records(keys)
+        else:
+            source = (tuple(row.get(key) for key in keys) for row in rows)
+        records = [(day, *record) for record in source]
+        if not records:
+            return 0
+        return await self._copy_and_merge(
+            session,
+            ["snapshot_date"] + [name for _, name in columns],
+            records,
+            table=MPStatSellerSnapshot.__table__,
+            conflict_keys=("snapshot_date", "supplier_id"),
+            update=False,
+        )
+
+    @session_manager
+    async def drop_snapshots_before(self, session: AsyncSession, day: date, detach_only: bool = False) -> List[str]:
+        """
+        Отсоединяет (и без detach_only удаляет) секции снимков старше day.
+        Это мгновенные операции над целыми таблицами вместо DELETE по миллионам строк.
+        """
+        table = MPStatSellerSnapshot.__table__
+        result = await session.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_namespace ns ON ns.oid = parent.relnamespace "
+            "WHERE parent.relname = :parent AND ns.nspname = :schema"
+        ), {"parent": table.name, "schema": table.schema})
+
+        removed = []
+        for (partition,) in result.all():
+            partition_day = datetime.strptime(partition.rsplit("_", 1)[-1], "%Y%m%d").date()
+            if partition_day >= day:
+                continue
+            await session.execute(text(f"ALTER TABLE {table.schema}.{table.name} DETACH PARTITION {table.schema}.{partition}"))
+            if not detach_only:
+                await session.execute(text(f"DROP TABLE {table.schema}.{partition}"))
+            removed.append(partition)
+
+        logger.info(f"🗑️ Снимки до {day}: {'отсоединено' if detach_only else 'удалено'} секций {len(removed)}")
+        return sorted(removed)
+
+    async def get_seller_history(
+        self,
+        supplier_ids: Iterable[int],
+        date_from: date,
+        date_to: date,
+        metrics: Iterable[str] = ("revenue", "sales", "position"),
+    ) -> List[Dict]:
+        """Динамика метрик продавцов по дневным снимкам; условие по snapshot_date отсекает лишние секции"""
+        stmt = (
+            select(
+                MPStatSellerSnapshot.snapshot_date,
+                MPStatSellerSnapshot.supplier_id,
+                *(getattr(MPStatSellerSnapshot, metric) for metric in metrics),
+            )
+            .where(
+                MPStatSellerSnapshot.snapshot_date.between(date_from, date_to),
+                MPStatSellerSnapshot.supplier_id.in_(list(supplier_ids)),
+            )
+            .order_by(MPStatSellerSnapshot.supplier_id, MPStatSellerSnapshot.snapshot_date)
+        )
+        async with self.db.session() as session:
+            result = await session.execute(stmt)
+            return [dict(row) for row in result.mappings().all()]
+
+    @staticmethod
+    def _seller_filters(
+        manager: str | Iterable[str] | None = None,
+        status: str | Iterable[str] | None = None,
+        revenue_min: float | None = None,
+        revenue_max: float | None = None,
+        position_max: int | None = None,
+        inn: str | None = None,
+        unassigned: bool = False,
+        include_missing: bool = True,
+    ) -> List:
+        """Условия WHERE по mp_sellers; None — фильтр не применяется, unassigned — продавцы без менеджера"""
+        conditions = []
+        for attr, value in ((MPStatSeller.manager, manager), (MPStatSeller.status, status)):
+            if isinstance(value, str):
+                conditions.append(attr == value)
+            elif value is not None:
+                conditions.append(attr.in_(list(value)))
+        if unassigned:
+            conditions.append(MPStatSeller.manager.is_(None))
+        if revenue_min is not None:
+            conditions.append(MPStatSeller.revenue >= revenue_min)
+        if revenue_max is not None:
+            conditions.append(MPStatSeller.revenue <= revenue_max)
+        if position_max is not None:
+            conditions.append(MPStatSeller.position <= position_max)
+        if inn is not None:
+            conditions.append(MPStatSeller.inn == inn)
+        if not include_missing:
+            conditions.append(MPStatSeller.missing_since.is_(None))
+        return conditions
+
+    @classmethod
+    def _export_query(cls, columns: Iterable[str] | None = None, **filters):
+        """SELECT по mp_sellers: в запрос попадают только нужные колонки и фильтры (_seller_filters)"""
+        keys = list(columns) if columns is not None else list(MPStatSeller.__mapper__.columns.keys())
+        stmt = select(*(getattr(MPStatSeller, key).label(key) for key in keys))
+        stmt = stmt.where(*cls._seller_filters(**filters))
+        return keys, stmt.order_by(MPStatSeller.supplier_id)
+
+    async def find_sellers(
+        self,
+        order_by: str = "revenue",
+        after: Tuple | None = None,
+        limit: int = 50,
+        columns: Iterable[str] | None = None,
+        **filters,
+    ) -> Tuple[List[Dict], Tuple | None]:
+        """
+        Страница продавцов для дашборда менеджеров: фильтры _seller_filters, сортировка по метрике
+        из SELLER_SORT_KEYS и keyset-пагинация. Возвращает (строки, курсор следующей страницы);
+        курсор передаётся обратно в after. В отличие от OFFSET, каждая страница читает только
+        limit строк из индекса, как бы далеко ни пролистали.
+        """
+        if order_by not in SELLER_SORT_KEYS:
+            raise ValueError(f"Сортировка по {order_by} не поддерживается, доступны: {', '.join(SELLER_SORT_KEYS)}")
+        metric = getattr(MPStatSeller, order_by)
+        descending = SELLER_SORT_KEYS[order_by]
+
+        keys = list(columns) if columns is not None else list(MPStatSeller.__mapper__.columns.keys())
+        keys += [key for key in (order_by, "supplier_id") if key not in keys]
+        # Продавцы без значения метрики в сортированный список не попадают — так работают частичные индексы
+        stmt = select(*(getattr(MPStatSeller, key).label(key) for key in keys)).where(
+            *self._seller_filters(**filters), metric.is_not(None)
+        )
+        if after is not None:
+            cursor = tuple_(metric, MPStatSeller.supplier_id)
+            stmt = stmt.where(cursor < tuple_(*after) if descending else cursor > tuple_(*after))
+        if descending:
+            stmt = stmt.order_by(metric.desc(), MPStatSeller.supplier_id.desc())
+        else:
+            stmt = stmt.order_by(metric.asc(), MPStatSeller.supplier_id.asc())
+
+        async with self.db.session() as session:
+            result = await session.execute(stmt.limit(limit))
+            rows = [dict(row) for row in result.mappings().all()]
+        next_after = (rows[-1][order_by], rows[-1]["supplier_id"]) if len(rows) == limit else None
+        return rows, next_after
+
+    async def top_sellers(self, metric: str = "revenue", n: int = 10, **filters) -> List[Dict]:
+        """Топ-N продавцов по метрике с теми же фильтрами, что и find_sellers"""
+        rows, _ = await self.find_sellers(order_by=metric, limit=n, **filters)
+        return rows
+
+    @session_manager
+    async def refresh_manager_summary(self, session: AsyncSession) -> bool:
+        """
+        Обновляет сводку по менеджерам и статусам (материализованное представление из миграции).
+        CONCURRENTLY — дашборды продолжают читать старую версию, пока строится новая.
+        """
+        exists_ = await session.scalar(text(f"SELECT to_regclass('public.{MANAGER_SUMMARY_VIEW}') IS NOT NULL"))
+        if not exists_:
+            logger.warning(f"⚠️ Нет представления {MANAGER_SUMMARY_VIEW} — примените миграции alembic")
+            return False
+        await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY public.{MANAGER_SUMMARY_VIEW}"))
+        return True
+
+    async def get_manager_summary(self) -> List[Dict]:
+        """Сводка по менеджерам и статусам: число продавцов, суммарная и средняя выручка, упущенная выгода"""
+        async with self.db.session() as session:
+            result = await session.execute(text(
+                f"SELECT * FROM public.{MANAGER_SUMMARY_VIEW} ORDER BY revenue DESC NULLS LAST"
+            ))
+            return [dict(row) for row in result.mappings().all()]
+
+    async def _stream_sellers(self, chunk_size: int, **query) -> AsyncIterator[Tuple[List[str], List[tuple]]]:
+        keys, stmt = self._export_query(**query)
+        async with self.db.session() as session:
+            # stream + yield_per — серверный курсор: в памяти одновременно не больше chunk_size строк
+            result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+            async for rows in result.partitions():
+                yield keys, [tuple(row) for row in rows]
+
+    async def iter_seller_frames(self, chunk_size: int = 50_000, **query) -> AsyncIterator[pd.DataFrame]:
+        """
+        Продавцы из mp_sellers кусками по chunk_size строк в виде DataFrame (колонки — атрибуты MPStatSeller).
+        query — columns и фильтры _seller_filters (manager, status, revenue_min, revenue_max, ...).
+        """
+        async for keys, rows in self._stream_sellers(chunk_size, **query):
+            yield pd.DataFrame.from_records(rows, columns=keys)
+
+    async def export_sellers(self, path: str, fmt: str | None = None, chunk_size: int = 50_000, **query) -> int:
+        """
+        Потоковая выгрузка mp_sellers в Parquet (по row group на кусок, нужен pyarrow) или CSV.
+        Формат берётся из fmt или расширения path, фильтры — как у iter_seller_frames.
+        Память ограничена одним куском, а не всей таблицей.
+        """
+        fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Файл со схемой/заголовком создаётся до чтения: пустая выборка даёт пустой файл, а не его отсутствие
+        keys, _ = self._export_query(**query)
+        if fmt == "parquet":
+            writer = _parquet_writer(path, keys)
+        else:
+            writer = None
+            await asyncio.to_thread(pd.DataFrame(columns=keys).to_csv, path, index=False)
+
+        total = 0
+        try:
+            async for keys, rows in self._stream_sellers(chunk_size, **query):
+                if fmt == "parquet":
+                    await asyncio.to_thread(_write_parquet_chunk, writer, keys, rows)
+                else:
+                    frame = pd.DataFrame.from_records(rows, columns=keys)
+                    await asyncio.to_thread(frame.to_csv, path, mode="a", header=False, index=False)
+                total += len(rows)
+                logger.info(f"📤 Выгружено продавцов: {total}")
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info(f"✅ Выгрузка mp_sellers в {path} завершена: {total} строк")
+        return total
+
+    async def refresh_from_api(
+        self,
+        api: SellerParserAPI,
+        date: str,
+        batch_size: int = 20000,
+        queue_size: int = 4,
+        page_size: int = 5000,
+        concurrency: int = 1,
+        checkpoint: CrawlCheckpoint | None = None,
+        executor: Executor | None = None,
+        snapshot: bool = False,
+        incremental: bool = False,
+        flag_missing: bool = False,
+        refresh_summary: bool = True,
+        max_total: int | None = None,
+    ) -> Dict[str, float]:
+        """
+        Потоковая загрузка списка продавцов MPStats в mp_sellers:
+        загрузка страниц → преобразование в строки MPStatSeller → upsert пачками по batch_size.
+        Загрузка и запись идут параллельно через очередь на queue_size страниц;
+        если запись отстаёт, очередь заполняется и загрузка новых страниц приостанавливается.
+        Возвращает количество строк и скорость (строк/с) каждой стадии.
+        С checkpoint прогресс сохраняется только после записи пачки в БД, поэтому после падения
+        загрузка продолжается с первой незаписанной страницы; повтор страниц безопасен — это upsert.
+        С executor (обычно ProcessPoolExecutor) разбор JSON и приведение типов выполняются
+        в пуле (decode_seller_page), а event loop занят только сетью и записью; преобразование
+        в этом режиме входит во время стадии загрузки.
+        С snapshot каждая пачка дополнительно дописывается в дневной снимок mp_seller_snapshots.
+        С incremental пишутся только новые и изменившиеся продавцы (sync_sellers), в статистике
+        появляются unchanged/updated/inserted. С flag_missing после полного обхода продавцам,
+        которых не было в списке, проставляется missing_since.
+        С refresh_summary в конце обновляется сводка по менеджерам (refresh_manager_summary).
+        max_total ограничивает обход числом строк (None — до пустой страницы). Пропавшие продавцы
+        помечаются и чекпоинт закрывается, только если список дочитан до пустой страницы:
+        при остановке на max_total продавцы за пределом не считаются пропавшими.
+        """
+        start_offset = 0
+        if checkpoint is not None:
+            start_offset, finished = await checkpoint.get_offset(SELLER_LIST_CRAWL, date)
+            if finished:
+                logger.info(f"⏭️ Продавцы за {date} уже загружены (чекпоинт), пропускаем")
+                return {"rows": 0}
+
+        snapshot_day = to_date(date) if snapshot else None
+        if snapshot_day is not None:
+            # При продолжении по чекпоинту уже записанная часть снимка сохраняется
+            await self.start_snapshot(snapshot_day, overwrite=start_offset == 0)
+
+        if flag_missing and start_offset:
+            logger.warning("⚠️ Загрузка продолжена с чекпоинта — пропавшие продавцы не помечаются")
+            flag_missing = False
+        changes = {"unchanged": 0, "updated": 0, "inserted": 0}
+        seen_ids = array("q")
+        crawl_status: Dict = {}
+        # Продавцы без supplier_id: ключ NOT NULL, такие строки ломают COPY всей пачки
+        skipped = 0
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # стадия -> [строк, секунд работы]
+        stages = {"fetch": [0, 0.0], "transform": [0, 0.0], "write": [0, 0.0]}
+
+        async def fetch():
+            started = time.perf_counter()
+            async for page in api.iter_seller_pages(
+                date,
+                page_size=page_size,
+                concurrency=concurrency,
+                start_offset=start_offset,
+                decode=decode_seller_page if executor is not None else None,
+                executor=executor,
+                max_total=max_total,
+                status=crawl_status,
+            ):
+                stages["fetch"][0] += len(page)
+                stages["fetch"][1] += time.perf_counter() - started
+                await queue.put(page)
+                started = time.perf_counter()
+            await queue.put(None)
+
+        async def write(buffer: list, rows: int, next_offset: int):
+            started = time.perf_counter()
+            data = buffer if executor is None else SellerBatch.concat(buffer)
+            if incremental:
+                for key, count in (await self.sync_sellers(data)).items():
+                    changes[key] += count
+            elif executor is None:
+                await self.upsert_sellers(data)
+            else:
+                await self.upsert_batch(data)
+            if flag_missing:
+                if executor is None:
+                    seen_ids.extend(row["supplier_id"] for row in data if row["supplier_id"] is not None)
+                else:
+                    seen_ids.extend(data.columns["supplier_id"].dropna().tolist())
+            if snapshot_day is not None:
+                await self.append_snapshot(snapshot_day, data)
+            stages["write"][0] += rows
+            stages["write"][1] += time.perf_counter() - started
+            logger.info(f"💾 Записано продавцов: {stages['write'][0]} ({self._rate(stages['write'])} строк/с)")
+            if checkpoint is not None:
+                await checkpoint.save_offset(SELLER_LIST_CRAWL, date, next_offset)
+
+        async def transform_and_write():
+            nonlocal skipped
+            # строки-словари, либо SellerBatch из пула
+            buffer: list = []
+            buffered = 0
+            next_offset = start_offset
+            while (page := await queue.get()) is not None:
+                started = time.perf_counter()
+                if executor is None:
+                    rows = [row for row in map(seller_to_row, page) if row["supplier_id"] is not None]
+                    buffer.extend(rows)
+                    kept = len(rows)
+                else:
+                    batch = page.dropna("supplier_id")
+                    buffer.append(batch)
+                    kept = len(batch)
+                if kept < len(page):
+                    skipped += len(page) - kept
+                    logger.warning(f"⚠️ Пропущено продавцов без supplier_id: {len(page) - kept} (всего {skipped})")
+                buffered += kept
+                next_offset = page.next_offset
+                stages["transform"][0] += len(page)
+                stages["transform"][1] += time.perf_counter() - started
+
+                if buffered >= batch_size:
+                    await write(buffer, buffered, next_offset)
+                    buffer, buffered = [], 0
+            if buffer:
+                await write(buffer, buffered, next_offset)
+            if crawl_status.get("reason") != "end":
+                logger.warning("⚠️ Список продавцов загружен не до конца — пропавшие не помечаются, чекпоинт не закрыт")
+                return
+            if flag_missing:
+                changes["missing"] = await self.mark_missing_sellers(seen_ids, to_date(date))
+            if checkpoint is not None:
+                await checkpoint.save_offset(SELLER_LIST_CRAWL, date, next_offset, finished=True)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(fetch()), asyncio.create_task(transform_and_write())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in tasks:
+            if not task.cancelled() and task.exception():
+                raise task.exception()
+
+        elapsed = time.perf_counter() - started
+        stats = {f"{stage}_rows_per_sec": self._rate(counters) for stage, counters in stages.items()}
+        stats.update(
+            rows=stages["write"][0], skipped=skipped, complete=crawl_status.get("reason") == "end",
+            elapsed_sec=round(elapsed, 1),
+        )
+        logger.info(
+            f"🎉 Загрузка продавцов за {date} завершена: {stats['rows']} строк за {stats['elapsed_sec']} с "
+            f"(загрузка {stats['fetch_rows_per_sec']}, преобразование {stats['transform_rows_per_sec']}, "
+            f"запись {stats['write_rows_per_sec']} строк/с)"
+            + (f", пропущено без supplier_id: {skipped}" if skipped else "")
+        )
+        if incremental or flag_missing:
+            stats.update(changes)
+            logger.info(
+                f"🔁 Изменения: без изменений {changes['unchanged']}, обновлено {changes['updated']}, "
+                f"новых {changes['inserted']}, пропавших {changes.get('missing', 0)}"
+            )
+        if refresh_summary and stats["rows"]:
+            await self.refresh_manager_summary()
+        return stats
+
+    @staticmethod
+    def _rate(counters: list) -> float:
+        rows, seconds = counters
+        return round(rows / seconds, 1) if seconds else 0.0
@@ -1,19 +1,130 @@
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
+from typing import Dict
 import os
+import time
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает выдачи соединений (checkouts), а отдельно — те из них,
+    что ждали свободное соединение (свободных нет и переполнение исчерпано), и как долго.
+    Время на открытие нового соединения ожиданием не считается.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _must_wait(self) -> bool:
+        return self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+
+    def _do_get(self):
+        must_wait = self._must_wait()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            if must_wait:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
 
 class Database:
-    """Асинхронный доступ к движку и сессиям"""
-    async_engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=True)
-    async_session_factory: async_sessionmaker = async_sessionmaker(async_engine, expire_on_commit=False)
+    """
+    Асинхронный доступ к движку и сессиям.
+    Движок создаётся при первом обращении (а не при импорте) и общий для всех экземпляров.
+    Настройки берутся из окружения:
+    DATABASE_URL, DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING и DB_STATEMENT_CACHE_SIZE (кэш prepared statements asyncpg, 0 — для pgbouncer).
+    """
+    _engine: AsyncEngine | None = None
+    _session_factory: async_sessionmaker | None = None
+
+    @staticmethod
+    def engine_options() -> Dict:
+        return {
+            "echo": _env_bool("DB_ECHO"),
+            "poolclass": TimedQueuePool,
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": _env_bool("DB_POOL_PRE_PING"),
+            "connect_args": {"prepared_statement_cache_size": _env_int("DB_STATEMENT_CACHE_SIZE", 100)},
+        }
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        if Database._engine is None:
+            url = os.getenv("DATABASE_URL")
+            if not url:
+                raise RuntimeError("Не задана переменная окружения DATABASE_URL")
+            Database._engine = create_async_engine(url, **self.engine_options())
+        return Database._engine
+
+    @property
+    def async_session_factory(self) -> async_sessionmaker:
+        if Database._session_factory is None:
+            Database._session_factory = async_sessionmaker(self.async_engine, expire_on_commit=False)
+        return Database._session_factory
 
     def session(self):
         return self.async_session_factory()
 
+    def pool_stats(self) -> Dict[str, float]:
+        """
+        Состояние пула: размер, выданные соединения, переполнение, число выдач (checkouts)
+        и ожидание свободного соединения: waits — сколько выдач ждали, wait_avg_ms — среднее по ним
+        """
+        if Database._engine is None:
+            return {}
+        pool = Database._engine.sync_engine.pool
+        stats = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+        if isinstance(pool, TimedQueuePool):
+            stats.update(
+                checkouts=pool.checkouts,
+                waits=pool.waits,
+                wait_avg_ms=round(pool.wait_seconds / pool.waits * 1000, 2) if pool.waits else 0.0,
+                wait_max_ms=round(pool.max_wait_seconds * 1000, 2),
+                timeouts=pool.timeouts,
+            )
+        return stats
+
+    async def dispose(self):
+        """Закрывает все соединения пула; следующий вызов создаст движок заново"""
+        if Database._engine is not None:
+            await Database._engine.dispose()
+            Database._engine = None
+            Database._session_factory = None
+
 class Base(DeclarativeBase):
     pass
@@ -1,16 +1,23 @@
 from sqlalchemy import (
-    Integer, String, Float, Date, Boolean
+    Integer, String, Float, Date, DateTime, Boolean, Index
 )
 from sqlalchemy.dialects.postgresql import BIGINT
 from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime
 from database.entities.core import Base
 
-class MPStatSeller(Base):
-    __tablename__ = "mp_sellers"
-    __table_args__ = {"schema": "public"}
+# Колонки, которые ведут менеджеры вручную — загрузка из MPStats их не трогает
+CRM_FIELDS = ("phone", "status", "comment", "manager")
 
-    # PK — supplier_id
-    supplier_id: Mapped[int] = mapped_column("supplier_id", Integer, primary_key=True)
+# Служебные колонки инкрементальной загрузки — в ответе MPStats их нет
+SYNC_FIELDS = ("content_hash", "missing_since")
+
+# Ключи JSON списка продавцов MPStats совпадают с именами колонок mp_sellers,
+# кроме идентификатора — в части ответов он приходит как "id"
+MPSTAT_SELLER_ALIASES = {"supplier_id": ("supplier_id", "id")}
+
+class SellerMetricsMixin:
+    """Поля продавца из списка MPStats — общие для mp_sellers и дневных снимков"""
 
     # базовые поля из списка
     name: Mapped[str] = mapped_column("name", String, nullable=True)
@@ -80,8 +87,108 @@ class MPStatSeller(Base):
         "supplier_loyalty_program_level", Integer, nullable=True
     )
 
+class MPStatSeller(SellerMetricsMixin, Base):
+    __tablename__ = "mp_sellers"
+    __table_args__ = {"schema": "public"}
+
+    # PK — supplier_id
+    supplier_id: Mapped[int] = mapped_column("supplier_id", Integer, primary_key=True)
+
     # ваши дополнительные поля
     phone: Mapped[str] = mapped_column("Телефон", String, nullable=True)
     status: Mapped[str] = mapped_column("Статус", String, nullable=True)
     comment: Mapped[str] = mapped_column("Комментарий", String, nullable=True)
     manager: Mapped[str] = mapped_column("Менеджер", String, nullable=True)
+
+    # хэш полей из MPStats — по нему инкрементальная загрузка пропускает неизменившихся продавцов
+    content_hash: Mapped[int] = mapped_column("content_hash", BIGINT, nullable=True)
+    # дата загрузки, в которой продавца не оказалось в списке MPStats
+    missing_since: Mapped[date] = mapped_column("missing_since", Date, nullable=True)
+
+# Индексы под фильтры и сортировки дашбордов (MPStatSellersORM.find_sellers);
+# частичные — продавцы без метрики в сортированные списки не попадают
+Index(
+    "ix_mp_sellers_manager_revenue",
+    MPStatSeller.manager, MPStatSeller.revenue.desc(), MPStatSeller.supplier_id.desc(),
+    postgresql_where=MPStatSeller.revenue.is_not(None),
+)
+Index(
+    "ix_mp_sellers_status_revenue",
+    MPStatSeller.status, MPStatSeller.revenue.desc(), MPStatSeller.supplier_id.desc(),
+    postgresql_where=MPStatSeller.revenue.is_not(None),
+)
+Index(
+    "ix_mp_sellers_revenue",
+    MPStatSeller.revenue.desc(), MPStatSeller.supplier_id.desc(),
+    postgresql_where=MPStatSeller.revenue.is_not(None),
+)
+Index(
+    "ix_mp_sellers_lost_profit",
+    MPStatSeller.lost_profit.desc(), MPStatSeller.supplier_id.desc(),
+    postgresql_where=MPStatSeller.lost_profit.is_not(None),
+)
+Index(
+    "ix_mp_sellers_position",
+    MPStatSeller.position, MPStatSeller.supplier_id,
+    postgresql_where=MPStatSeller.position.is_not(None),
+)
+Index("ix_mp_sellers_inn", MPStatSeller.inn, postgresql_where=MPStatSeller.inn.is_not(None))
+
+class MPStatSellerSnapshot(SellerMetricsMixin, Base):
+    """
+    Дневные снимки списка продавцов MPStats. Таблица секционирована по snapshot_date
+    (по секции на день, см. MPStatSellersORM.start_snapshot), поэтому запросы по диапазону дат
+    читают только нужные секции, а старые дни удаляются отсоединением секции.
+    """
+    __tablename__ = "mp_seller_snapshots"
+    __table_args__ = (
+        Index("ix_mp_seller_snapshots_supplier_date", "supplier_id", "snapshot_date"),
+        {"schema": "public", "postgresql_partition_by": "RANGE (snapshot_date)"},
+    )
+
+    snapshot_date: Mapped[date] = mapped_column("snapshot_date", Date, primary_key=True)
+    supplier_id: Mapped[int] = mapped_column("supplier_id", Integer, primary_key=True)
+
+class Supplier(Base):
+    """Поставщики из Excel-выгрузки; заголовки выгрузки — имена колонок (как в таблице до e1ed456386ac)"""
+    __tablename__ = "suppliers"
+    __table_args__ = {"schema": "public"}
+
+    id: Mapped[int] = mapped_column("id", Integer, primary_key=True, autoincrement=True)
+    inn: Mapped[str] = mapped_column("inn", String, nullable=True)
+    wb_profile: Mapped[str] = mapped_column("Профиль на сайте Wildberries", String, nullable=True)
+    seller_name: Mapped[str] = mapped_column("Название продавца", String, nullable=True)
+    product_section: Mapped[str] = mapped_column("Раздел товаров", String, nullable=True)
+    product_category: Mapped[str] = mapped_column("Категория товаров", String, nullable=True)
+    items_sold: Mapped[int] = mapped_column("Товаров продано", Integer, nullable=True)
+    review_count: Mapped[int] = mapped_column("Количество отзывов", Integer, nullable=True)
+    seller_rating: Mapped[float] = mapped_column("Рейтинг продавца", Float, nullable=True)
+    percent_purchased: Mapped[float] = mapped_column("% выкупленных товаров", Float, nullable=True)
+    registration_date: Mapped[datetime] = mapped_column("Регистрация на Wildberries", DateTime, nullable=True)
+    legal_address: Mapped[str] = mapped_column("Юридический адрес", String, nullable=True)
+    phone_mobile: Mapped[str] = mapped_column("Рабочие телефоны мобильные", String, nullable=True)
+    phone_city: Mapped[str] = mapped_column("Рабочие телефоны городские", String, nullable=True)
+    email: Mapped[str] = mapped_column("Рабочие Email", String, nullable=True)
+    # Postgres обрезает имена до 63 байт — так эти колонки и называются в БД
+    email_alt: Mapped[str] = mapped_column("Рабочие Email дополнительный источн", String, nullable=True)
+    website: Mapped[str] = mapped_column("Сайт", String, nullable=True)
+    whatsapp: Mapped[str] = mapped_column("Whatsapp", String, nullable=True)
+    telegram: Mapped[str] = mapped_column("Telegram", String, nullable=True)
+    vk: Mapped[str] = mapped_column("VK", String, nullable=True)
+    instagram: Mapped[str] = mapped_column("Instagram", String, nullable=True)
+    ok: Mapped[str] = mapped_column("OK", String, nullable=True)
+    avg_sales_per_day: Mapped[float] = mapped_column("Среднее количество продаваемых то", Float, nullable=True)
+    company_status: Mapped[str] = mapped_column("Статус компании", String, nullable=True)
+    liquidation_date: Mapped[datetime] = mapped_column("Дата ликвидации", DateTime, nullable=True)
+
+# На уникальном индексе держится дедупликация при импорте (ON CONFLICT DO NOTHING по профилю)
+Index("uq_suppliers_wb_profile", Supplier.wb_profile, unique=True)
+
+class InnLookupFailure(Base):
+    """Ссылки WB, по которым не удалось получить ИНН, — чтобы не перезапрашивать их по кругу"""
+    __tablename__ = "inn_lookup_failures"
+    __table_args__ = {"schema": "public"}
+
+    wb_profile: Mapped[str] = mapped_column("wb_profile", String, primary_key=True)
+    attempts: Mapped[int] = mapped_column("attempts", Integer, nullable=False, default=1)
+    retry_after: Mapped[datetime] = mapped_column("retry_after", DateTime(timezone=True), nullable=False)
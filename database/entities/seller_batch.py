@@ -0,0 +1,168 @@
+import json
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from sqlalchemy import BigInteger, Boolean, Date, Float, Integer
+
+from database.entities.models import MPStatSeller, CRM_FIELDS, SYNC_FIELDS, MPSTAT_SELLER_ALIASES
+
+# Колонки с небольшим числом повторяющихся значений — храним как category
+CATEGORICAL_FIELDS = ("most_frequent_country",)
+
+# Приведение одного значения из ответа MPStats к типу колонки MPStatSeller.
+# Та же логика повторена векторно в _convert: построчный (seller_to_row) и колоночный
+# (SellerBatch) пути должны давать одинаковые значения, иначе разойдётся content_hash.
+
+def to_date(val) -> date:
+    if isinstance(val, datetime):
+        return val.date()
+    if isinstance(val, date):
+        return val
+    return datetime.strptime(str(val)[:10], "%Y-%m-%d").date()
+
+def to_int(val) -> int:
+    # Дробные значения отбрасываются (а не округляются)
+    if isinstance(val, int):
+        return val
+    return int(float(val))
+
+def to_bool(val) -> bool:
+    if isinstance(val, str):
+        return val.strip().lower() in ("1", "true", "yes", "да")
+    return bool(val)
+
+SCALAR_COERCERS: Dict[str, Callable] = {"bool": to_bool, "date": to_date, "int": to_int, "float": float, "str": str}
+
+def _kind(column) -> str:
+    if isinstance(column.type, Boolean):
+        return "bool"
+    if isinstance(column.type, Date):
+        return "date"
+    if isinstance(column.type, (BigInteger, Integer)):
+        return "int"
+    if isinstance(column.type, Float):
+        return "float"
+    return "str"
+
+# Общая спецификация полей: (атрибут MPStatSeller, ключи в JSON MPStats, тип из SCALAR_COERCERS)
+SELLER_FIELDS: List[Tuple[str, Tuple[str, ...], str]] = [
+    (key, MPSTAT_SELLER_ALIASES.get(column.name, (column.name,)), _kind(column))
+    for key, column in MPStatSeller.__mapper__.columns.items()
+    if key not in CRM_FIELDS + SYNC_FIELDS
+]
+
+_DTYPES = {"bool": "boolean", "date": "datetime64[ns]", "int": "Int64", "float": "float64", "str": "string"}
+
+# (атрибут MPStatSeller, ключи в JSON MPStats, dtype колонки)
+SELLER_BATCH_FIELDS = [
+    (key, json_keys, "category" if key in CATEGORICAL_FIELDS else _DTYPES[kind])
+    for key, json_keys, kind in SELLER_FIELDS
+]
+
+def _convert(values: pd.Series, dtype: str) -> pd.Series:
+    """Векторный аналог SCALAR_COERCERS; values — исходные объекты из JSON (dtype object)"""
+    values = values.where(values.notna() & (values != ""), None)
+    if dtype == "Int64":
+        return np.trunc(pd.to_numeric(values, errors="coerce")).astype("Int64")
+    if dtype == "float64":
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+    if dtype == "boolean":
+        return values.map(to_bool, na_action="ignore").astype("boolean")
+    if dtype == "datetime64[ns]":
+        as_text = values.map(str, na_action="ignore").str.slice(0, 10)
+        return pd.to_datetime(as_text, errors="coerce", format="%Y-%m-%d")
+    # str(), как в построчном пути: 7701234567 -> "7701234567", без промежуточного float
+    as_text = values.map(str, na_action="ignore").astype("string")
+    return as_text.astype("category") if dtype == "category" else as_text
+
+class SellerBatch:
+    """
+    Колоночное представление продавцов MPStats: по одной типизированной колонке pandas
+    на каждое поле MPStatSeller (Int64 с пропусками для целых, float64 для метрик,
+    category для most_frequent_country). Страницы ответа переводятся в колонки сразу
+    при получении, что в разы компактнее списка словарей, а to_frame/to_parquet/records
+    отдают данные в DataFrame, Parquet и COPY без промежуточных словарей.
+    """
+
+    def __init__(self, columns: Dict[str, pd.Series]):
+        self.columns = columns
+        # Положение страницы в обходе MPStats (заполняет SellerParserAPI.iter_seller_pages)
+        self.offset: int | None = None
+        self.next_offset: int | None = None
+
+    @classmethod
+    def from_page(cls, items: List[Dict]) -> "SellerBatch":
+        columns = {}
+        for key, json_keys, dtype in SELLER_BATCH_FIELDS:
+            # Значения берутся как есть (object), без вывода dtype по всей колонке:
+            # иначе целые с пропусками становятся float и ИНН превращается в "7701234567.0".
+            # Как в seller_to_row, берётся первый непустой из ключей-синонимов
+            values = pd.Series(
+                [next((item[k] for k in json_keys if item.get(k) is not None), None) for item in items],
+                dtype=object,
+            )
+            columns[key] = _convert(values, dtype)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, batches: Iterable["SellerBatch"]) -> "SellerBatch":
+        batches = list(batches)
+        if not batches:
+            return cls.from_page([])
+        columns = {}
+        for key, _, dtype in SELLER_BATCH_FIELDS:
+            parts = [batch.columns[key] for batch in batches]
+            if dtype == "category":
+                # union_categoricals не даёт колонке выродиться в object при разных наборах категорий
+                columns[key] = pd.Series(union_categoricals(parts, ignore_order=True))
+            else:
+                columns[key] = pd.concat(parts, ignore_index=True)
+        return cls(columns)
+
+    def dropna(self, key: str) -> "SellerBatch":
+        """Пачка без строк, где key пуст (например, продавцы без supplier_id); положение в обходе сохраняется"""
+        keep = self.columns[key].notna()
+        if keep.all():
+            return self
+        batch = SellerBatch({name: series[keep].reset_index(drop=True) for name, series in self.columns.items()})
+        batch.offset, batch.next_offset = self.offset, self.next_offset
+        return batch
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(series.memory_usage(deep=True, index=False)) for series in self.columns.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, copy=False)
+
+    def to_parquet(self, path: str, **kwargs):
+        """Запись в Parquet (нужен pyarrow)"""
+        self.to_frame().to_parquet(path, index=False, **kwargs)
+
+    def records(self, keys: Iterable[str]) -> Iterator[tuple]:
+        """Строки-кортежи из Python-значений в порядке keys — готовый вход для COPY"""
+        arrays = []
+        for key in keys:
+            series = self.columns.get(key)
+            if series is None:
+                arrays.append([None] * len(self))
+                continue
+            values = series.dt.date if series.dtype.kind == "M" else series
+            arrays.append(values.astype(object).where(series.notna(), None).tolist())
+        return zip(*arrays)
+
+def decode_seller_page(body: bytes) -> SellerBatch:
+    """
+    Разбор сырого ответа /api/seller/list сразу в SellerBatch.
+    Функция верхнего уровня, чтобы её можно было отдавать в ProcessPoolExecutor:
+    JSON, очистка и приведение типов выполняются в дочернем процессе, обратно
+    передаются уже компактные колонки.
+    """
+    data = json.loads(body)
+    return SellerBatch.from_page(data.get("sellers") or data.get("data") or [])
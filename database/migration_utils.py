@@ -0,0 +1,199 @@
+"""
+Помощники для онлайн-миграций больших таблиц (mp_sellers, suppliers) в alembic/versions.
+
+Вместо одного UPDATE/ALTER на всю таблицу, который держит блокировку минутами и раздувает WAL:
+
+    from database.migration_utils import batched_backfill, create_index_concurrently
+
+    def upgrade() -> None:
+        op.add_column('mp_sellers', sa.Column('revenue_band', sa.String(), nullable=True), schema='public')
+        batched_backfill(
+            'mp_sellers',
+            "revenue_band = CASE WHEN revenue >= 1e6 THEN 'A' ELSE 'B' END",
+            where='revenue_band IS NULL',
+            key='supplier_id',
+        )
+        create_index_concurrently('ix_mp_sellers_revenue_band', 'mp_sellers', ['revenue_band'])
+
+Каждая пачка коммитится сама по себе (autocommit_block), прогресс хранится в
+public.migration_backfill_progress, поэтому прерванная миграция при повторном
+`alembic upgrade` продолжает с последней записанной пачки.
+Помощники читают ответы БД, поэтому в offline-режиме (`alembic upgrade --sql`) не работают.
+"""
+import contextlib
+import time
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PROGRESS_TABLE = "public.migration_backfill_progress"
+
+# SQLSTATE lock_not_available — пачка не дождалась блокировки за lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+
+@contextlib.contextmanager
+def _autocommit(connection: Connection | None) -> Iterator[Connection]:
+    """Внутри миграции — autocommit_block alembic; снаружи — переданное соединение (в autocommit)"""
+    if connection is not None:
+        yield connection
+        return
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        yield op.get_bind()
+
+def _ensure_progress_table(conn: Connection):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        " job text PRIMARY KEY, last_key bigint, rows_done bigint NOT NULL DEFAULT 0,"
+        " finished boolean NOT NULL DEFAULT false, updated_at timestamptz NOT NULL DEFAULT now())"
+    ))
+
+def _lock_timeout_error(error: DBAPIError) -> bool:
+    orig = error.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == LOCK_NOT_AVAILABLE
+
+def batched_backfill(
+    table: str,
+    set_clause: str,
+    where: str | None = None,
+    key: str = "id",
+    schema: str = "public",
+    batch_size: int = 5000,
+    pause: float = 0.1,
+    job: str | None = None,
+    lock_timeout: str = "5s",
+    max_retries: int = 5,
+    log_every: float = 10.0,
+    connection: Connection | None = None,
+) -> int:
+    """
+    UPDATE {schema}.{table} SET {set_clause} [WHERE {where}] пачками по batch_size строк
+    в порядке целочисленного ключа key (keyset, без OFFSET), каждая пачка — отдельная транзакция.
+    Между пачками пауза pause секунд, чтобы не забивать диск, WAL и реплики; пачка, не получившая
+    блокировку за lock_timeout, повторяется до max_retries раз. Прогресс (последний ключ) пишется
+    в migration_backfill_progress под именем job — повторный запуск продолжает с него, а
+    завершённое задание пропускается. Возвращает число обновлённых строк за этот запуск.
+    """
+    job = job or f"{schema}.{table}: {set_clause}"
+    target = f"{schema}.{table}"
+    condition = f" AND ({where})" if where else ""
+    updated = 0
+
+    with _autocommit(connection) as conn:
+        _ensure_progress_table(conn)
+        state = conn.execute(
+            text(f"SELECT last_key, rows_done, finished FROM {PROGRESS_TABLE} WHERE job = :job"), {"job": job}
+        ).first()
+        if state is not None and state.finished:
+            logger.info(f"⏭️ Бэкфилл «{job}» уже выполнен ({state.rows_done} строк)")
+            return 0
+
+        last_key = state.last_key if state is not None else None
+        rows_done = state.rows_done if state is not None else 0
+        if last_key is not None:
+            logger.info(f"🔁 Бэкфилл «{job}» продолжается с {key} > {last_key} (уже {rows_done} строк)")
+
+        bounds = conn.execute(text(f"SELECT min({key}), max({key}) FROM {target}")).first()
+        conn.execute(text(f"SET lock_timeout = '{lock_timeout}'"))
+        started = time.perf_counter()
+        logged = started
+        try:
+            while True:
+                after = f"{key} > :last" if last_key is not None else "TRUE"
+                # Верхняя граница пачки — batch_size-й ключ после last_key; идёт по индексу ключа
+                upper = conn.execute(text(
+                    f"SELECT max({key}) FROM (SELECT {key} FROM {target} "
+                    f"WHERE {after} ORDER BY {key} LIMIT :limit) AS batch"
+                ), {"last": last_key, "limit": batch_size}).scalar()
+                if upper is None:
+                    break
+
+                for attempt in range(1, max_retries + 1):
+                    try:
+                        result = conn.execute(text(
+                            f"UPDATE {target} SET {set_clause} "
+                            f"WHERE {after} AND {key} <= :upper{condition}"
+                        ), {"last": last_key, "upper": upper})
+                        break
+                    except DBAPIError as e:
+                        if not _lock_timeout_error(e) or attempt == max_retries:
+                            raise
+                        logger.warning(f"⏳ Бэкфилл «{job}»: нет блокировки ({attempt}/{max_retries}), повтор")
+                        time.sleep(pause * 2 ** attempt)
+
+                last_key = upper
+                rows_done += result.rowcount
+                updated += result.rowcount
+                conn.execute(text(
+                    f"INSERT INTO {PROGRESS_TABLE} (job, last_key, rows_done) VALUES (:job, :last, :rows) "
+                    f"ON CONFLICT (job) DO UPDATE SET last_key = EXCLUDED.last_key, "
+                    f"rows_done = EXCLUDED.rows_done, updated_at = now()"
+                ), {"job": job, "last": last_key, "rows": rows_done})
+
+                now = time.perf_counter()
+                if now - logged >= log_every:
+                    logged = now
+                    span = (bounds[1] - bounds[0]) or 1
+                    logger.info(
+                        f"📈 Бэкфилл «{job}»: {key} ≤ {last_key} (~{(last_key - bounds[0]) / span:.0%}), "
+                        f"обновлено {rows_done} строк, {updated / (now - started):.0f} строк/с"
+                    )
+                if pause:
+                    time.sleep(pause)
+        finally:
+            conn.execute(text("RESET lock_timeout"))
+
+        conn.execute(text(
+            f"INSERT INTO {PROGRESS_TABLE} (job, last_key, rows_done, finished) VALUES (:job, :last, :rows, true) "
+            f"ON CONFLICT (job) DO UPDATE SET finished = true, rows_done = EXCLUDED.rows_done, updated_at = now()"
+        ), {"job": job, "last": last_key, "rows": rows_done})
+
+    logger.info(f"✅ Бэкфилл «{job}» завершён: {rows_done} строк за {time.perf_counter() - started:.1f} с")
+    return updated
+
+def _drop_invalid_index(conn: Connection, name: str, schema: str):
+    """Прерванный CREATE INDEX CONCURRENTLY оставляет INVALID-индекс, который IF NOT EXISTS не пересоздаст"""
+    invalid = conn.execute(text(
+        "SELECT NOT i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = :name AND n.nspname = :schema"
+    ), {"name": name, "schema": schema}).scalar()
+    if invalid:
+        logger.warning(f"⚠️ Индекс {schema}.{name} невалиден после прерванной сборки — пересоздаём")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}"))
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: List[str],
+    schema: str = "public",
+    where: str | None = None,
+    unique: bool = False,
+    connection: Connection | None = None,
+):
+    """
+    CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS вне транзакции миграции: запись в таблицу
+    не блокируется. columns — SQL-выражения ('revenue DESC', '"Менеджер"'), where — условие
+    частичного индекса. Невалидный остаток прошлой попытки удаляется и индекс строится заново.
+    """
+    with _autocommit(connection) as conn:
+        _drop_invalid_index(conn, name, schema)
+        started = time.perf_counter()
+        conn.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {schema}.{table} ({', '.join(columns)})" + (f" WHERE {where}" if where else "")
+        ))
+    logger.info(f"✅ Индекс {schema}.{name} построен за {time.perf_counter() - started:.1f} с")
+
+def drop_index_concurrently(name: str, schema: str = "public", connection: Connection | None = None):
+    """DROP INDEX CONCURRENTLY IF EXISTS вне транзакции миграции"""
+    with _autocommit(connection) as conn:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}"))
@@ -0,0 +1,54 @@
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import ResponseCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(cache_module.time, "time", tick)
+    return now
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "mpstats.sqlite"), max_bytes=10_000)
+    yield cache
+    cache.close()
+
+def payload(i: int):
+    # Плохо сжимаемое тело, чтобы размер записи был предсказуемо большим
+    return {"seller_id": i, "data": [f"{i}-{j}-{j * 7919 % 104729}" for j in range(300)]}
+
+def test_get_returns_what_was_set(cache):
+    cache._set("seller/summary", "1", payload(1))
+
+    assert cache._get("seller/summary", "1") == payload(1)
+    assert cache._get("seller/summary", "2") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_eviction_keeps_size_under_limit_and_drops_least_recently_read(cache):
+    cache._set("seller/summary", "0", payload(0))
+    cache._set("seller/summary", "1", payload(1))
+    # Запись 0 прочитана позже записи 1 — вытесняться первой должна 1
+    cache._get("seller/summary", "0")
+    for i in range(2, 12):
+        cache._set("seller/summary", str(i), payload(i))
+
+    assert cache.evictions > 0
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache._get("seller/summary", "1") is None
+    # Учтённый размер совпадает с тем, что лежит в SQLite
+    stored = cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    assert stored == cache.stats()["bytes"]
+
+def test_expired_entries_are_misses(cache, clock):
+    cache._set("seller/summary", "1", payload(1))
+    clock[0] += cache.ttl["seller/summary"] + 10
+
+    assert cache._get("seller/summary", "1") is None
@@ -0,0 +1,85 @@
+import pytest
+
+from utils import seller_parcer_api
+from utils.seller_parcer_api import AdaptiveController, RequestScheduler
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое time.monotonic в seller_parcer_api"""
+    now = [1000.0]
+    monkeypatch.setattr(seller_parcer_api.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(seller_parcer_api.random, "uniform", lambda low, high: high)
+
+def test_controller_grows_on_fast_responses_up_to_limits():
+    controller = AdaptiveController(concurrency=1, page_size=4000, max_concurrency=3, page_step=500, target_latency=10)
+
+    for _ in range(20):
+        controller.on_success(latency=1.0)
+
+    assert controller.concurrency == 3
+    assert controller.page_size == 5000
+
+def test_controller_page_size_defaults_to_known_good_limit():
+    controller = AdaptiveController()
+
+    for _ in range(50):
+        controller.on_success(latency=0.1)
+
+    assert controller.page_size == 5000
+
+def test_controller_shrinks_page_on_slow_response_and_both_on_timeout():
+    controller = AdaptiveController(concurrency=8, page_size=4000, min_page_size=500, target_latency=10)
+
+    controller.on_success(latency=20.0)
+    assert (controller.concurrency, controller.page_size) == (8, 2000)
+
+    controller.on_timeout()
+    assert (controller.concurrency, controller.page_size) == (4, 1000)
+
+    for _ in range(10):
+        controller.on_timeout()
+    assert (controller.concurrency, controller.page_size) == (1, 500)
+    assert controller.counters["timeout"] == 11
+
+def test_controller_throttle_status_shrinks_concurrency_only():
+    controller = AdaptiveController(concurrency=8, page_size=3000)
+
+    controller.on_status(429)
+    controller.on_status(500)
+
+    assert (controller.concurrency, controller.page_size) == (2, 3000)
+    assert controller.counters["throttled"] == 1
+    assert controller.counters["error"] == 1
+
+def test_throttled_escalates_once_per_pause(clock, no_jitter):
+    scheduler = RequestScheduler(queue_delay=10, max_delay=600)
+
+    assert scheduler.throttled() == 10
+    # Ответы на запросы, отправленные до паузы, её не наращивают
+    clock[0] += 4
+    assert scheduler.throttled() == pytest.approx(6)
+    assert scheduler.throttled() == pytest.approx(6)
+    assert scheduler._throttled_in_row == 1
+
+    # Отказ после окончания паузы — следующая ступень
+    clock[0] += 10
+    assert scheduler.throttled() == 20
+    assert scheduler._throttled_in_row == 2
+
+def test_throttled_resets_after_success(clock, no_jitter):
+    scheduler = RequestScheduler(queue_delay=10)
+
+    scheduler.throttled()
+    clock[0] += 11
+    scheduler.succeeded()
+
+    assert scheduler.throttled() == 10
+
+def test_backoff_is_capped(no_jitter):
+    scheduler = RequestScheduler(base_delay=10, max_delay=60)
+
+    assert [scheduler.backoff(attempt) for attempt in range(5)] == [10, 20, 40, 60, 60]
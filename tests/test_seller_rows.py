@@ -0,0 +1,68 @@
+import math
+from datetime import date
+
+from database.controller.ORM import MPStatSellersORM, seller_to_row
+from database.entities.seller_batch import SELLER_FIELDS, SellerBatch
+
+KEYS = [key for key, _, _ in SELLER_FIELDS]
+
+# Продавцы с теми значениями, на которых построчный и колоночный пути расходились
+ITEMS = [
+    {"id": 1, "name": "Первый", "inn": 7701234567, "first_date": "2020-01-05", "position": 2.7,
+     "sales": 10.9, "revenue": 1.5, "is_premium": "Да", "most_frequent_country": "Китай"},
+    {"id": 2, "name": "", "inn": None, "first_date": "2021-03-04T10:00:00+03:00", "position": "3.9",
+     "sales": None, "revenue": "2.25", "is_premium": 0, "most_frequent_country": None},
+    {"id": 3, "name": None, "inn": "7709876543", "first_date": "bad", "position": -2.5,
+     "sales": "x", "revenue": 3, "is_premium": "no", "most_frequent_country": 5},
+    {"supplier_id": 4, "inn": 7700000004, "first_date": None, "is_premium": True},
+]
+
+def _normalize(values):
+    return tuple(None if isinstance(v, float) and math.isnan(v) else v for v in values)
+
+def test_row_and_batch_values_match():
+    rows = [seller_to_row(item) for item in ITEMS]
+    records = list(SellerBatch.from_page(ITEMS).records(KEYS))
+
+    assert len(records) == len(rows)
+    for row, record in zip(rows, records):
+        assert _normalize(row[key] for key in KEYS) == _normalize(record)
+
+def test_row_and_batch_content_hash_match():
+    orm = MPStatSellersORM()
+    row_columns, row_records = orm._seller_records([seller_to_row(item) for item in ITEMS])
+    batch_columns, batch_records = orm._seller_records(SellerBatch.from_page(ITEMS))
+
+    assert row_columns == batch_columns
+    position = row_columns.index("content_hash")
+    assert [r[position] for r in row_records] == [r[position] for r in batch_records]
+
+def test_numeric_inn_with_gaps_stays_integer_text():
+    record = dict(zip(KEYS, next(SellerBatch.from_page(ITEMS).records(KEYS))))
+
+    assert record["inn"] == "7701234567"
+    assert seller_to_row(ITEMS[0])["inn"] == "7701234567"
+
+def test_fractional_integers_are_truncated():
+    records = [dict(zip(KEYS, record)) for record in SellerBatch.from_page(ITEMS).records(KEYS)]
+
+    assert [r["position"] for r in records[:3]] == [2, 3, -2]
+    assert records[0]["sales"] == 10
+    assert seller_to_row(ITEMS[0])["position"] == 2
+
+def test_dates_take_calendar_day_from_iso_text():
+    records = [dict(zip(KEYS, record)) for record in SellerBatch.from_page(ITEMS).records(KEYS)]
+
+    assert records[0]["first_date"] == date(2020, 1, 5)
+    assert records[1]["first_date"] == date(2021, 3, 4)
+    assert records[2]["first_date"] is None
+
+def test_dropna_removes_rows_without_key_and_keeps_offsets():
+    batch = SellerBatch.from_page([{"id": 1}, {"name": "без id"}, {"id": 3}])
+    batch.offset, batch.next_offset = 100, 103
+
+    kept = batch.dropna("supplier_id")
+
+    assert len(kept) == 2
+    assert kept.columns["supplier_id"].tolist() == [1, 3]
+    assert (kept.offset, kept.next_offset) == (100, 103)
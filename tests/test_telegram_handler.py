@@ -0,0 +1,95 @@
+import logging
+
+import pytest
+
+from utils import logger as logger_module
+from utils.logger import TelegramLogHandler
+
+class RecordingHandler(TelegramLogHandler):
+    """TelegramLogHandler без сети: отправленные сообщения копятся в sent"""
+
+    def __init__(self, *args, **kwargs):
+        self.sent = []
+        super().__init__("token", "chat", *args, **kwargs)
+
+    def _send(self, text: str):
+        self.sent.append(text)
+
+@pytest.fixture
+def handler():
+    # Поток отправки спит, пока его не закроют: тест сам вызывает _build_messages
+    handler = RecordingHandler(dedupe_window=300.0, flush_interval=3600.0)
+    yield handler
+    handler.close()
+
+def entry(message: str, level: str = "ERROR", name: str = "seller_parcer_api"):
+    return level, name, message, f"[{level}] [{name}] {message}"
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Вскоре после загрузки системы monotonic() меньше dedupe_window
+    now = [1.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_first_seen_key_is_sent_even_when_monotonic_is_small(handler, clock):
+    messages = handler._build_messages([entry("boom seller_id=1")])
+
+    assert len(messages) == 1
+    assert "boom seller_id=1" in messages[0]
+
+def test_repeats_within_window_are_counted_and_reported_after_it(handler, clock):
+    first = handler._build_messages([entry("boom"), entry("boom"), entry("boom")])
+    assert "(повторов: 2)" in first[0]
+
+    clock[0] += 10
+    assert handler._build_messages([entry("boom"), entry("boom")]) == []
+
+    clock[0] += 300
+    later = handler._build_messages([])
+    assert len(later) == 1
+    assert "повторилось ещё 2 раз" in later[0]
+    assert handler._recent == {}
+
+def test_final_flush_reports_pending_repeats(handler, clock):
+    handler._build_messages([entry("boom")])
+    handler._build_messages([entry("boom")])
+
+    final = handler._build_messages([], final=True)
+
+    assert len(final) == 1
+    assert "повторилось ещё 1 раз" in final[0]
+
+def test_log_text_stays_inside_code_blocks(handler, clock):
+    handler._build_messages([entry("нет ответа seller_id=5 *x* [y]")])
+    handler._build_messages([entry("нет ответа seller_id=5 *x* [y]")])
+    text = handler._build_messages([], final=True)[0]
+
+    # Markdown-разметка Telegram: вне ``` допускаются только наши заголовки
+    outside = "".join(part for i, part in enumerate(text.split("```")) if i % 2 == 0)
+    assert "seller_id" not in outside
+
+def test_long_batches_are_split_by_message_limit(handler, clock):
+    batch = [entry(f"ошибка {i} " + "x" * 1500) for i in range(6)]
+
+    messages = handler._build_messages(batch)
+
+    assert len(messages) > 1
+    assert all(len(message) <= TelegramLogHandler.MAX_MESSAGE_LENGTH for message in messages)
+
+def test_min_level_filters_records():
+    handler = RecordingHandler(min_level=logging.ERROR, flush_interval=0.01)
+    log = logging.getLogger("tests.telegram_min_level")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(handler)
+    try:
+        log.info("скрыто")
+        log.error("видно")
+    finally:
+        handler.close()
+        log.removeHandler(handler)
+
+    text = "\n".join(handler.sent)
+    assert "видно" in text
+    assert "скрыто" not in text
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Сколько живут ответы MPStats по умолчанию, секунды
+DEFAULT_TTL = {
+    "seller/summary": 24 * 3600,
+    "seller/list": 7 * 24 * 3600,  # список за прошедшую дату уже не меняется
+}
+
+class ResponseCache:
+    """
+    Локальный кэш ответов MPStats в SQLite.
+    Ключ — (endpoint, seller_id/дата, offset), значение — сжатое zlib JSON-тело ответа.
+    У каждого endpoint свой TTL, при превышении max_bytes вытесняются давно не читанные записи (LRU).
+    """
+
+    def __init__(
+        self,
+        path: str = "./cache/mpstats.sqlite",
+        ttl: Dict[str, float] | None = None,
+        default_ttl: float = 24 * 3600,
+        max_bytes: int = 2 * 2 ** 30,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " endpoint TEXT NOT NULL, key TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (endpoint, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses (accessed)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return ":".join(str(part) for part in parts)
+
+    async def get(self, endpoint: str, key: str) -> Any | None:
+        return await asyncio.to_thread(self._get, endpoint, key)
+
+    async def set(self, endpoint: str, key: str, data: Any):
+        await asyncio.to_thread(self._set, endpoint, key, data)
+
+    def _get(self, endpoint: str, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, created FROM responses WHERE endpoint = ? AND key = ?", (endpoint, key)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl.get(endpoint, self.default_ttl):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE endpoint = ? AND key = ?", (now, endpoint, key)
+            )
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def _set(self, endpoint: str, key: str, data: Any):
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE endpoint = ? AND key = ?", (endpoint, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (endpoint, key, body, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, key, body, len(body), now, now),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Удаляет самые давно читанные записи, пока кэш не уложится в 90% лимита"""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT endpoint, key, size FROM responses ORDER BY accessed")
+        victims = []
+        for endpoint, key, size in rows:
+            if self._size <= target:
+                break
+            victims.append((endpoint, key))
+            self._size -= size
+        self._conn.executemany("DELETE FROM responses WHERE endpoint = ? AND key = ?", victims)
+        self.evictions += len(victims)
+        logger.info(f"🧹 Кэш MPStats: вытеснено {len(victims)} записей")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "bytes": self._size}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Set, Tuple
+
+class CrawlCheckpoint:
+    """
+    Локальное хранилище прогресса длинных обходов MPStats (SQLite).
+    Для постраничных обходов хранится следующий offset и признак завершения,
+    для обходов по продавцам — множество уже обработанных seller_id.
+    Прогресс ведётся отдельно для каждой пары (обход, дата).
+    """
+
+    def __init__(self, path: str = "./cache/crawl_state.sqlite"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS offsets ("
+            " crawl TEXT NOT NULL, date TEXT NOT NULL, next_offset INTEGER NOT NULL,"
+            " finished INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL, PRIMARY KEY (crawl, date))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " crawl TEXT NOT NULL, date TEXT NOT NULL, item TEXT NOT NULL, PRIMARY KEY (crawl, date, item))"
+        )
+
+    async def get_offset(self, crawl: str, date: str) -> Tuple[int, bool]:
+        """(offset, с которого продолжать, обход уже завершён)"""
+        return await asyncio.to_thread(self._get_offset, crawl, date)
+
+    async def save_offset(self, crawl: str, date: str, next_offset: int, finished: bool = False):
+        await asyncio.to_thread(self._save_offset, crawl, date, next_offset, finished)
+
+    async def done_items(self, crawl: str, date: str) -> Set[str]:
+        return await asyncio.to_thread(self._done_items, crawl, date)
+
+    async def mark_items(self, crawl: str, date: str, items: Iterable):
+        await asyncio.to_thread(self._mark_items, crawl, date, [str(item) for item in items])
+
+    async def reset(self, crawl: str, date: str):
+        await asyncio.to_thread(self._reset, crawl, date)
+
+    def _get_offset(self, crawl: str, date: str) -> Tuple[int, bool]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_offset, finished FROM offsets WHERE crawl = ? AND date = ?", (crawl, date)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def _save_offset(self, crawl: str, date: str, next_offset: int, finished: bool):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO offsets (crawl, date, next_offset, finished, updated) VALUES (?, ?, ?, ?, ?)",
+                (crawl, date, next_offset, int(finished), time.time()),
+            )
+
+    def _done_items(self, crawl: str, date: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT item FROM items WHERE crawl = ? AND date = ?", (crawl, date))
+            return {row[0] for row in rows}
+
+    def _mark_items(self, crawl: str, date: str, items: list):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO items (crawl, date, item) VALUES (?, ?, ?)",
+                [(crawl, date, item) for item in items],
+            )
+
+    def _reset(self, crawl: str, date: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM offsets WHERE crawl = ? AND date = ?", (crawl, date))
+            self._conn.execute("DELETE FROM items WHERE crawl = ? AND date = ?", (crawl, date))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
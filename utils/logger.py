@@ -1,30 +1,199 @@
 import logging
+import queue
 import sys
+import threading
+import time
 import requests
 import os
-from typing import Literal
+from typing import Dict, List, Literal
 
 LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 
+def _code_block(text: str) -> str:
+    # Текст лога — только внутри блока кода: одиночные «_», «*», «[» вне его Telegram (Markdown) отвергает
+    return "```\n" + text.replace("```", "'''") + "\n```"
+
 class TelegramLogHandler(logging.Handler):
-    def __init__(self, token: str, chat_id: str, min_level: int = logging.ERROR):
-        super().__init__(level=logging.INFO)
+    """
+    Отправка логов в Telegram без блокировки вызывающего кода.
+    emit только кладёт запись в очередь, отправляет фоновый поток:
+    пачки записей склеиваются в одно сообщение (до 4096 символов), одинаковые ошибки
+    в пределах dedupe_window отправляются один раз с числом повторов, между запросами
+    к Telegram выдерживается min_send_interval. При переполнении очереди записи
+    отбрасываются и об этом сообщается в следующем сообщении. close() дожидается отправки
+    и досылает счётчики ещё не отправленных повторов.
+    """
+
+    MAX_MESSAGE_LENGTH = 4096
+
+    def __init__(
+        self,
+        token: str,
+        chat_id: str,
+        min_level: int = logging.ERROR,
+        flush_interval: float = 2.0,
+        min_send_interval: float = 1.0,
+        dedupe_window: float = 300.0,
+        queue_size: int = 1000,
+    ):
+        super().__init__(level=min_level)
         self.token = token
         self.chat_id = chat_id
         self.api_url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        self.flush_interval = flush_interval
+        self.min_send_interval = min_send_interval
+        self.dedupe_window = dedupe_window
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._last_sent = 0.0
+        self._recent: Dict[tuple, list] = {}  # ключ записи -> [время отправки, подавлено повторов]
+        self._http = requests.Session()
+        self._thread = threading.Thread(target=self._run, name="telegram-log-sender", daemon=True)
+        self._thread.start()
 
     def emit(self, record):
         try:
-            log_entry = self.format(record)
-            payload = {
-                "chat_id": self.chat_id,
-                "text": f"🛠️ *{record.levelname}* из `{record.name}`:\n```\n{log_entry}\n```",
-                "parse_mode": "Markdown"
-            }
-            requests.post(self.api_url, data=payload)
+            entry = (record.levelname, record.name, record.getMessage(), self.format(record))
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._dropped += 1
         except Exception:
             self.handleError(record)
 
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+        super().close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            # Ждём с таймаутом: в тишине тоже нужно досылать повторы, у которых истекло окно
+            try:
+                entry = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                entry = ()
+            if entry is None:
+                break
+
+            # Ошибка в одной пачке не должна останавливать поток: иначе логи перестанут уходить совсем
+            try:
+                if not entry:
+                    for text in self._build_messages([]):
+                        self._send(text)
+                    continue
+
+                # Собираем всё, что успело прийти за flush_interval, в одну пачку
+                batch = [entry]
+                deadline = time.monotonic() + self.flush_interval
+                while (timeout := deadline - time.monotonic()) > 0:
+                    try:
+                        entry = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if entry is None:
+                        stopping = True
+                        break
+                    batch.append(entry)
+
+                for text in self._build_messages(batch):
+                    self._send(text)
+            except Exception as e:
+                print(f"❌ Ошибка отправки логов в Telegram: {e}", file=sys.stderr)
+
+        # Завершение: досылаем подавленные повторы и счётчик отброшенных записей
+        try:
+            for text in self._build_messages([], final=True):
+                self._send(text)
+        except Exception as e:
+            print(f"❌ Ошибка отправки логов в Telegram: {e}", file=sys.stderr)
+
+    def _build_messages(self, batch: List[tuple], final: bool = False) -> List[str]:
+        """Сообщения для пачки записей; final=True — сбросить все накопленные повторы (при закрытии)"""
+        now = time.monotonic()
+        counts: Dict[tuple, int] = {}
+        entries: Dict[tuple, tuple] = {}
+        for level, name, message, log_entry in batch:
+            key = (level, name, message)
+            counts[key] = counts.get(key, 0) + 1
+            entries.setdefault(key, (level, name, log_entry))
+
+        blocks = []
+        if self._dropped:
+            blocks.append(f"⚠️ Очередь переполнена, пропущено сообщений: {self._dropped}")
+            self._dropped = 0
+
+        for key, (level, name, log_entry) in entries.items():
+            recent = self._recent.get(key)
+            if recent is not None and now - recent[0] < self.dedupe_window:
+                recent[1] += counts[key]
+                continue
+            repeats = counts[key] - 1 + (recent[1] if recent is not None else 0)
+            self._recent[key] = [now, 0]
+
+            header = f"🛠️ *{level}* из `{name}`" + (f" (повторов: {repeats})" if repeats else "") + ":"
+            limit = self.MAX_MESSAGE_LENGTH - len(header) - 10
+            if len(log_entry) > limit:
+                log_entry = log_entry[:limit - 1] + "…"
+            blocks.append(f"{header}\n{_code_block(log_entry)}")
+
+        for key, (sent_at, suppressed) in list(self._recent.items()):
+            if final or now - sent_at >= self.dedupe_window:
+                del self._recent[key]
+                if suppressed:
+                    level, name, message = key
+                    blocks.append(f"🔁 *{level}* из `{name}` повторилось ещё {suppressed} раз:\n{_code_block(message[:200])}")
+
+        messages, current = [], ""
+        for block in blocks:
+            if current and len(current) + len(block) + 1 > self.MAX_MESSAGE_LENGTH:
+                messages.append(current)
+                current = ""
+            current = f"{current}\n{block}" if current else block
+        if current:
+            messages.append(current)
+        return messages
+
+    def _send(self, text: str):
+        wait = self._last_sent + self.min_send_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        payload = {"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}
+        try:
+            resp = self._http.post(self.api_url, data=payload, timeout=10)
+            if resp.status_code == 429:
+                retry_after = resp.json().get("parameters", {}).get("retry_after", 5)
+                time.sleep(retry_after)
+                resp = self._http.post(self.api_url, data=payload, timeout=10)
+            if resp.status_code == 400:
+                # Разметку не разобрали — отправляем как обычный текст, чтобы не потерять всю пачку
+                del payload["parse_mode"]
+                resp = self._http.post(self.api_url, data=payload, timeout=10)
+            if not resp.ok:
+                print(f"❌ Telegram отклонил лог [{resp.status_code}]: {resp.text[:500]}", file=sys.stderr)
+        except Exception as e:
+            print(f"❌ Не удалось отправить лог в Telegram: {e}", file=sys.stderr)
+        finally:
+            self._last_sent = time.monotonic()
+
+_telegram_handlers: Dict[tuple, TelegramLogHandler] = {}
+_telegram_lock = threading.Lock()
+
+def _shared_telegram_handler(token: str, chat_id: str, min_level: int, formatter: logging.Formatter) -> TelegramLogHandler:
+    """
+    Один обработчик (и один поток отправки) на чат для всех логгеров: ограничение частоты
+    и подавление повторов действуют на весь чат, а не на каждый модуль отдельно
+    """
+    key = (token, chat_id, min_level)
+    with _telegram_lock:
+        handler = _telegram_handlers.get(key)
+        if handler is None:
+            handler = _telegram_handlers[key] = TelegramLogHandler(token=token, chat_id=chat_id, min_level=min_level)
+            handler.setFormatter(formatter)
+        return handler
+
 def setup_logger(name: str = None, level: LogLevel = "INFO") -> logging.Logger:
     logger = logging.getLogger(name)
     if logger.hasHandlers():
@@ -52,8 +221,7 @@ def setup_logger(name: str = None, level: LogLevel = "INFO") -> logging.Logger:
         tg_token = os.getenv("TELEGRAM_LOG_TOKEN")
         tg_chat_id = os.getenv("TELEGRAM_LOG_CHAT_ID")
         if tg_token and tg_chat_id:
-            tg_handler = TelegramLogHandler(token=tg_token, chat_id=tg_chat_id)
-            tg_handler.setFormatter(formatter)
-            logger.addHandler(tg_handler)
+            tg_level = logging.getLevelName(os.getenv("TELEGRAM_LOG_LEVEL", "ERROR").upper())
+            logger.addHandler(_shared_telegram_handler(tg_token, tg_chat_id, tg_level, formatter))
 
     return logger
@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Границы корзин гистограмм, секунды
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _labels_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Монотонный счётчик с метками"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {value}" for key, value in self.values.items()]
+
+class Gauge(Counter):
+    """Текущее значение с метками"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self.values[key] = value
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (как histogram в Prometheus) и оценкой квантилей по ним"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счётчики по корзинам (+Inf последней), сумма, количество]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def quantile(self, q: float, key: Tuple[str, ...]) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль q"""
+        counts, _, total = self.values[key]
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total_sum, total_count) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels_text(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labelnames, key)} {total_sum}")
+            lines.append(f"{self.name}_count{_labels_text(self.labelnames, key)} {total_count}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Набор метрик процесса. collectors — функции, которые обновляют метрики прямо перед выгрузкой
+    (например, состояние пула соединений).
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Counter | Histogram] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка сборщика метрик {collector.__name__}: {e}")
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Короткая сводка для лога: по гистограммам — количество, p50/p99, по счётчикам — суммы"""
+        self.collect()
+        parts = []
+        for metric in self.metrics.values():
+            if isinstance(metric, Histogram):
+                for key, (_, total_sum, total_count) in metric.values.items():
+                    label = "/".join(key) or metric.name
+                    parts.append(
+                        f"{label}: {total_count} шт, p50≤{metric.quantile(0.5, key)} с, "
+                        f"p99≤{metric.quantile(0.99, key)} с, всего {total_sum:.1f} с"
+                    )
+            elif metric.values and not isinstance(metric, Gauge):
+                parts.append(f"{metric.name}={sum(metric.values.values()):g}")
+        return "; ".join(parts) or "нет данных"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "mpstats_request_seconds", "Время запроса к MPStats до получения заголовков ответа", ("endpoint",)
+)
+HTTP_RESPONSES = REGISTRY.counter("mpstats_responses_total", "Ответы MPStats по кодам", ("endpoint", "status"))
+HTTP_RESPONSE_BYTES = REGISTRY.counter("mpstats_response_bytes_total", "Получено байт тела ответов", ("endpoint",))
+HTTP_RETRIES = REGISTRY.counter("mpstats_retries_total", "Повторы запросов к MPStats", ("endpoint", "reason"))
+HTTP_BACKOFF_SECONDS = REGISTRY.counter("mpstats_backoff_seconds_total", "Суммарные паузы перед повторами", ("endpoint",))
+
+DB_TRANSACTION_SECONDS = REGISTRY.histogram(
+    "db_transaction_seconds", "Длительность транзакций session_manager", ("method", "outcome")
+)
+DB_ROWS_WRITTEN = REGISTRY.counter("db_rows_written_total", "Записано строк методами session_manager", ("method",))
+
+def mpstats_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig для aiohttp.ClientSession: задержка, коды ответов и объём тела по каждому endpoint"""
+
+    async def on_request_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+        ctx.endpoint = params.url.path
+
+    async def on_request_end(session, ctx, params):
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - ctx.started, endpoint=ctx.endpoint)
+        HTTP_RESPONSES.inc(endpoint=ctx.endpoint, status=params.response.status)
+
+    async def on_request_exception(session, ctx, params):
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - ctx.started, endpoint=ctx.endpoint)
+        HTTP_RESPONSES.inc(endpoint=ctx.endpoint, status=type(params.exception).__name__)
+
+    async def on_response_chunk_received(session, ctx, params):
+        HTTP_RESPONSE_BYTES.inc(len(params.chunk), endpoint=params.url.path)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9108, registry: MetricsRegistry = REGISTRY) -> web.AppRunner:
+    """Поднимает /metrics в формате Prometheus; остановка — await runner.cleanup()"""
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"📈 Метрики доступны на http://{host}:{port}/metrics")
+    return runner
+
+async def log_metrics_periodically(interval: float = 60.0, registry: MetricsRegistry = REGISTRY):
+    """Раз в interval секунд пишет в лог сводку метрик; запускать через asyncio.create_task"""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"📊 Метрики: {registry.summary()}")
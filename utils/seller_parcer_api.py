@@ -1,37 +1,362 @@
 import asyncio
 import aiohttp
+import contextlib
+import random
 import re
-from typing import List, Dict
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Iterable, List, Dict, Tuple
 
+from utils.cache import ResponseCache
+from utils.checkpoint import CrawlCheckpoint
 from utils.logger import setup_logger
+from utils.metrics import HTTP_BACKOFF_SECONDS, HTTP_RETRIES, mpstats_trace_config
 
 logger = setup_logger(__name__)
 
+# Имена обходов в CrawlCheckpoint
+SELLER_LIST_CRAWL = "seller/list"
+SELLER_SUMMARY_CRAWL = "seller/summary"
+
+class SellerListError(Exception):
+    """Страница списка продавцов не загрузилась после всех повторов"""
+
+class SellerPage(list):
+    """Страница списка продавцов; offset и next_offset нужны для сохранения прогресса"""
+
+    def __init__(self, sellers: Iterable[Dict], offset: int, next_offset: int):
+        super().__init__(sellers)
+        self.offset = offset
+        self.next_offset = next_offset
+
+class RequestScheduler:
+    """
+    Общий для всех корутин планировщик запросов к MPStats:
+    - не больше max_concurrency запросов одновременно;
+    - не чаще rate_per_sec запросов в секунду (token bucket с запасом burst);
+    - экспоненциальная пауза с джиттером при ошибках;
+    - глобальная пауза, когда MPStats сообщает об очереди, — её соблюдают все ожидающие.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        rate_per_sec: float = 2.0,
+        burst: int | None = None,
+        base_delay: float = 10.0,
+        queue_delay: float = 60.0,
+        max_delay: float = 600.0,
+    ):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = burst or max(1, int(rate_per_sec))
+        self.base_delay = base_delay
+        self.queue_delay = queue_delay
+        self.max_delay = max_delay
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._throttled_in_row = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self._semaphore:
+            await self._take_token()
+            yield
+
+    async def _take_token(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_sec)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+
+    def _jitter(self, delay: float) -> float:
+        delay = min(self.max_delay, delay)
+        return random.uniform(delay / 2, delay)
+
+    def backoff(self, attempt: int) -> float:
+        """Пауза перед повтором после ошибки (attempt считается с 0)"""
+        return self._jitter(self.base_delay * 2 ** attempt)
+
+    def throttled(self) -> float:
+        """
+        MPStats попросил подождать: ставим на паузу всех, пауза растёт при повторных отказах.
+        Отказы, пришедшие во время уже идущей паузы (ответы на запросы, отправленные до неё),
+        пауза не наращивают — возвращается её остаток.
+        """
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        delay = self._jitter(self.queue_delay * 2 ** self._throttled_in_row)
+        self._throttled_in_row += 1
+        self._paused_until = now + delay
+        return delay
+
+    def succeeded(self):
+        self._throttled_in_row = 0
+
+class AdaptiveController:
+    """
+    AIMD-регулятор загрузки списка продавцов: число одновременных запросов и размер страницы
+    подстраиваются под фактическую задержку MPStats.
+    - Быстрый успешный ответ — concurrency растёт аддитивно (примерно +1 за «круг» запросов),
+      при задержке меньше target_latency / 2 страница увеличивается на page_step.
+    - Медленный ответ — страница уменьшается в decrease_factor раз.
+    - Таймаут — уменьшаются и concurrency, и страница.
+    - 202/400/429 (очередь, лимит) и прочие ошибки — уменьшается concurrency.
+    Страница не растёт выше max_page_size: по умолчанию это 5000 — размер, который MPStats
+    гарантированно отдаёт целиком (больший запрос может вернуть усечённую страницу).
+    Текущие значения и история изменений доступны через metrics() и history.
+    """
+
+    THROTTLE_STATUSES = (202, 400, 429)
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        page_size: int = 5000,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        min_page_size: int = 500,
+        max_page_size: int = 5000,
+        page_step: int = 500,
+        target_latency: float = 15.0,
+        request_timeout: float = 120.0,
+        decrease_factor: float = 0.5,
+        history_size: int = 1000,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.page_step = page_step
+        self.target_latency = target_latency
+        self.request_timeout = request_timeout
+        self.decrease_factor = decrease_factor
+
+        self._concurrency = float(concurrency)
+        self.page_size = page_size
+        self.counters = {"success": 0, "slow": 0, "timeout": 0, "throttled": 0, "error": 0}
+        self.last_latency: float | None = None
+        self.history: deque = deque(maxlen=history_size)
+        self._record("start")
+
+    @property
+    def concurrency(self) -> int:
+        return int(self._concurrency)
+
+    def on_success(self, latency: float):
+        self.last_latency = latency
+        if latency > self.target_latency:
+            self.counters["slow"] += 1
+            self._shrink_page("slow")
+            return
+
+        self.counters["success"] += 1
+        before = (self.concurrency, self.page_size)
+        self._concurrency = min(self.max_concurrency, self._concurrency + 1 / self._concurrency)
+        if latency < self.target_latency / 2:
+            self.page_size = min(self.max_page_size, self.page_size + self.page_step)
+        if (self.concurrency, self.page_size) != before:
+            self._record("increase")
+
+    def on_timeout(self):
+        self.counters["timeout"] += 1
+        self._shrink_concurrency()
+        self._shrink_page("timeout")
+
+    def on_status(self, status: int):
+        if status in self.THROTTLE_STATUSES:
+            self.counters["throttled"] += 1
+            self._shrink_concurrency()
+            self._record(f"throttled:{status}")
+        else:
+            self.on_error()
+
+    def on_error(self):
+        self.counters["error"] += 1
+        self._shrink_concurrency()
+        self._record("error")
+
+    def _shrink_concurrency(self):
+        self._concurrency = max(self.min_concurrency, self._concurrency * self.decrease_factor)
+
+    def _shrink_page(self, reason: str):
+        self.page_size = max(self.min_page_size, int(self.page_size * self.decrease_factor))
+        self._record(reason)
+
+    def _record(self, reason: str):
+        self.history.append((time.time(), self.concurrency, self.page_size, reason))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "page_size": self.page_size,
+            "last_latency": self.last_latency,
+            **self.counters,
+        }
+
+class InnLookupCoalescer:
+    """
+    Склеивает одновременные запросы ИНН в один POST /api/inn/by-seller-links.
+    Ссылки копятся max_delay секунд или до max_batch_size штук, повторяющиеся ссылки
+    отправляются один раз, а ответ раздаётся всем ожидающим. Найденные пары ссылка→ИНН
+    запоминаются в LRU на cache_size записей. None в ответе значит, что MPStats ИНН не нашёл;
+    сетевая или HTTP-ошибка пробрасывается всем ожидающим этого запроса.
+    """
+
+    def __init__(
+        self, api: "SellerParserAPI", max_delay: float = 0.005, max_batch_size: int = 500, cache_size: int = 100_000
+    ):
+        self.api = api
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set = set()
+
+    async def resolve(self, links: Iterable[str]) -> Dict[str, str | None]:
+        loop = asyncio.get_running_loop()
+        result: Dict[str, str | None] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+
+        for link in dict.fromkeys(links):
+            if link in self._cache:
+                self._cache.move_to_end(link)
+                result[link] = self._cache[link]
+                self.cache_hits += 1
+                continue
+            if link not in self._pending:
+                self._pending[link] = loop.create_future()
+            waiting[link] = self._pending[link]
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        for link, future in waiting.items():
+            # shield — отмена одного вызывающего не должна отменять ответ для остальных
+            result[link] = await asyncio.shield(future)
+        return result
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        links = list(batch)
+        for i in range(0, len(links), self.max_batch_size):
+            chunk = {link: batch[link] for link in links[i:i + self.max_batch_size]}
+            task = asyncio.create_task(self._send(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: Dict[str, asyncio.Future]):
+        self.requests_sent += 1
+        try:
+            # fetch_inns_by_links не глотает ошибки: сбой сети — исключение у всех ожидающих, а не «ИНН нет»
+            data = await self.api.fetch_inns_by_links(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {entry['link']: entry['inn'] for entry in data if entry.get('inn')}
+        for link, inn in found.items():
+            self._cache[link] = inn
+            self._cache.move_to_end(link)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        for link, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(link))
+
 class SellerParserAPI:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        scheduler: RequestScheduler | None = None,
+        cache: ResponseCache | None = None,
+        controller: AdaptiveController | None = None,
+    ):
         self.base_url = base_url.rstrip("/")  # Удаляем / на всякий случай
         self.session: aiohttp.ClientSession | None = None
+        self.scheduler = scheduler or RequestScheduler()
+        self.cache = cache  # необязательный локальный кэш ответов (см. utils.cache)
+        self.inn_lookup = InnLookupCoalescer(self)
+        self.controller = controller  # необязательная автоподстройка загрузки списка продавцов
 
     async def init_session(self):
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(trace_configs=[mpstats_trace_config()])
 
-    async def get_inns_by_links(self, links: List[str]) -> List[Dict]:
+    async def _cache_get(self, endpoint: str, *key_parts) -> Any | None:
+        if self.cache is None:
+            return None
+        return await self.cache.get(endpoint, ResponseCache.make_key(*key_parts))
+
+    async def _cache_set(self, endpoint: str, data: Any, *key_parts):
+        if self.cache is not None and data:
+            await self.cache.set(endpoint, ResponseCache.make_key(*key_parts), data)
+
+    async def fetch_inns_by_links(self, links: List[str]) -> List[Dict]:
+        """
+        То же, что get_inns_by_links, но без подавления ошибок: сетевая ошибка, таймаут
+        или не-2xx ответ пробрасываются (aiohttp.ClientError / asyncio.TimeoutError).
+        Пустой список — MPStats ответил, но ИНН не нашёл.
+        """
         await self.init_session()
         url = f"{self.base_url}/api/inn/by-seller-links"
 
+        async with self.session.post(url, json={"links": links}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            return data.get("results", [])
+
+    async def get_inns_by_links(self, links: List[str]) -> List[Dict]:
         try:
-            async with self.session.post(url, json={"links": links}) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("results", [])
+            return await self.fetch_inns_by_links(links)
         except aiohttp.ClientResponseError as e:
             print(f"HTTP error: {e.status} - {e.message}")
         except Exception as e:
             print(f"Unexpected error: {e}")
         return []
 
+    async def get_inn(self, link: str) -> str | None:
+        """
+        ИНН по одной ссылке; одновременные вызовы склеиваются в один запрос (см. InnLookupCoalescer).
+        None — ИНН не найден; при ошибке запроса бросается aiohttp.ClientError / asyncio.TimeoutError.
+        """
+        return (await self.inn_lookup.resolve([link]))[link]
+
+    async def get_inns(self, links: Iterable[str]) -> Dict[str, str | None]:
+        """ИНН по нескольким ссылкам через общий InnLookupCoalescer"""
+        return await self.inn_lookup.resolve(links)
+
     async def get_seller_summary(self, seller_id: int) -> Dict:
+        if (cached := await self._cache_get("seller/summary", seller_id)) is not None:
+            return cached
+
         await self.init_session()
         url = f"{self.base_url}/api/seller/summary"
         params = {"seller_id": seller_id}
@@ -43,66 +368,125 @@ class SellerParserAPI:
                     print(f"❌ Ошибка MPStats [{resp.status}] для seller_id={seller_id}\nОтвет: {text}")
                     return {}
                 try:
-                    return await resp.json()
+                    data = await resp.json()
                 except Exception as e:
                     print(f"❌ Ошибка парсинга JSON seller_id={seller_id}: {e}\nТело ответа: {text}")
                     return {}
+                await self._cache_set("seller/summary", data, seller_id)
+                return data
         except aiohttp.ClientResponseError as e:
             print(f"HTTP error: {e.status} - {e.message}")
         except Exception as e:
             print(f"Unexpected error: {e}")
         return {}
 
-    async def get_seller_summary_safe(self, seller_id: int) -> dict:
+    async def get_seller_summary_safe(self, seller_id: int, max_attempts: int = 3) -> dict:
+        """
+        Summary продавца с повторами. Все запросы проходят через общий self.scheduler:
+        ответ MPStats «Ожидание очереди» / «один отчет» ставит на паузу все ожидающие корутины,
+        а не только текущую.
+        """
+        if (cached := await self._cache_get("seller/summary", seller_id)) is not None:
+            return cached
+
         await self.init_session()
         url = f"{self.base_url}/api/seller/summary"
         params = {"seller_id": seller_id}
 
-        for attempt in range(3):
-            try:
-                async with self.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    text = await resp.text()
-
-                    if resp.status == 204:
-                        logger.warning(f"⛔ Нет данных по seller_id={seller_id}")
-                        return {}
-
-                    if resp.status in (202, 400) and (
-                        "Ожидание очереди" in text or "один отчет" in text
-                    ):
-                        logger.warning(f"⏳ MPStats ограничение seller_id={seller_id}: {text.strip()}")
-                        await asyncio.sleep(120)  # 🔁 ждём минуту
-                        continue
+        for attempt in range(max_attempts):
+            async with self.scheduler.slot():
+                try:
+                    async with self.session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                        text = await resp.text()
 
-                    resp.raise_for_status()
-                    return await resp.json()
+                        if resp.status == 204:
+                            logger.warning(f"⛔ Нет данных по seller_id={seller_id}")
+                            return {}
+
+                        if resp.status in (202, 400) and (
+                            "Ожидание очереди" in text or "один отчет" in text
+                        ):
+                            delay = self.scheduler.throttled()
+                            HTTP_RETRIES.inc(endpoint="/api/seller/summary", reason="throttled")
+                            logger.warning(
+                                f"⏳ MPStats ограничение seller_id={seller_id}: {text.strip()} — общая пауза {delay:.0f} с"
+                            )
+                            continue
+
+                        resp.raise_for_status()
+                        self.scheduler.succeeded()
+                        data = await resp.json()
+                        await self._cache_set("seller/summary", data, seller_id)
+                        return data
+
+                except asyncio.CancelledError:
+                    # Отмена (например, остановка iter_seller_summaries) — не ошибка, пробрасываем дальше
+                    raise
+                except Exception as e:
+                    delay = self.scheduler.backoff(attempt)
+                    HTTP_RETRIES.inc(endpoint="/api/seller/summary", reason=type(e).__name__)
+                    logger.warning(f"⚠️ Ошибка при получении summary seller_id={seller_id}: {e}, повтор через {delay:.0f} с")
 
-            except asyncio.CancelledError:
-                logger.error(f"❌ CancelledError: Запрос отменён для seller_id={seller_id}")
+            if attempt == max_attempts - 1:
                 break
-            except Exception as e:
-                logger.warning(f"⚠️ Ошибка при получении summary seller_id={seller_id}: {e}")
-                await asyncio.sleep(60)
+            # Ждём вне слота, чтобы не занимать место других запросов
+            HTTP_BACKOFF_SECONDS.inc(delay, endpoint="/api/seller/summary")
+            await asyncio.sleep(delay)
 
-        logger.error(f"❌ Не удалось получить выручку для seller_id={seller_id} после 3 попыток")
+        logger.error(f"❌ Не удалось получить выручку для seller_id={seller_id} после {max_attempts} попыток")
         return {}
 
+    async def iter_seller_summaries(
+        self, seller_ids: Iterable[int], checkpoint: CrawlCheckpoint | None = None, run: str | None = None
+    ) -> AsyncIterator[Tuple[int, dict]]:
+        """
+        Отдаёт (seller_id, summary) по мере готовности; параллелизм и частоту ограничивает self.scheduler.
+        С checkpoint продавцы, уже обработанные в этом запуске run (по умолчанию — сегодняшняя дата),
+        пропускаются; продавец отмечается обработанным, когда потребитель запросил следующий результат.
+        Пустые ответы не отмечаются и будут запрошены снова при следующем запуске.
+        """
+        run = run or time.strftime("%Y-%m-%d")
+        seller_ids = list(dict.fromkeys(seller_ids))
+        if checkpoint is not None:
+            done = await checkpoint.done_items(SELLER_SUMMARY_CRAWL, run)
+            if done:
+                total = len(seller_ids)
+                seller_ids = [seller_id for seller_id in seller_ids if str(seller_id) not in done]
+                logger.info(f"⏯️ Summary: {total - len(seller_ids)} продавцов уже обработаны в запуске {run}, пропускаем")
+
+        async def fetch(seller_id: int) -> Tuple[int, dict]:
+            return seller_id, await self.get_seller_summary_safe(seller_id)
+
+        tasks = [asyncio.create_task(fetch(seller_id)) for seller_id in seller_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                seller_id, summary = await next_done
+                yield seller_id, summary
+                if checkpoint is not None and summary:
+                    await checkpoint.mark_items(SELLER_SUMMARY_CRAWL, run, [seller_id])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_seller_summaries(
+        self, seller_ids: Iterable[int], checkpoint: CrawlCheckpoint | None = None, run: str | None = None
+    ) -> Dict[int, dict]:
+        """Summary сразу для многих продавцов (см. iter_seller_summaries)"""
+        return {
+            seller_id: summary
+            async for seller_id, summary in self.iter_seller_summaries(seller_ids, checkpoint=checkpoint, run=run)
+        }
+
     async def get_seller_list(self, date: str, limit: int = 500, offset: int = 0) -> List[Dict]:
+        if (cached := await self._cache_get("seller/list", date, offset, limit)) is not None:
+            return cached
+
         await self.init_session()
         url = f"{self.base_url}/api/seller/list?date={date}"
         results = []
 
-        payload = {
-            "startRow": offset,
-            "endRow": offset + limit,
-            "rowGroupCols": [],
-            "valueCols": [],
-            "pivotCols": [],
-            "pivotMode": False,
-            "groupKeys": [],
-            "filterModel": {},
-            "sortModel": []
-        }
+        payload = self._seller_list_payload(offset, limit)
 
         try:
             async with self.session.post(url, json=payload) as resp:
@@ -114,6 +498,7 @@ class SellerParserAPI:
                 data = await resp.json()
                 items = data.get("sellers") or data.get("data") or []
                 results.extend(items)
+                await self._cache_set("seller/list", items, date, offset, limit)
 
         except Exception as e:
             logger.error(f"❌ Ошибка при загрузке продавцов: {e}")
@@ -122,47 +507,232 @@ class SellerParserAPI:
         logger.info(f"✅ Загружено продавцов: {len(results)}")
         return results
 
-    async def get_all_sellers_paginated(self, date: str, max_total: int = 907250, page_size: int = 5000) -> List[Dict]:
-        await self.init_session()
-        all_sellers = []
-        offset = 0
-
-        while offset < max_total:
-            logger.info(f"📦 Загружаем продавцов {offset}–{offset + page_size}")
-            url = f"{self.base_url}/api/seller/list?date={date}"
-
-            payload = {
-                "startRow": offset,
-                "endRow": offset + page_size,
-                "rowGroupCols": [],
-                "valueCols": [],
-                "pivotCols": [],
-                "pivotMode": False,
-                "groupKeys": [],
-                "filterModel": {},
-                "sortModel": []
-            }
-
-            try:
-                async with self.session.post(url, json=payload) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        logger.warning(f"⚠️ Ошибка {resp.status}: {text}")
-                        break
+    @staticmethod
+    def _seller_list_payload(offset: int, limit: int) -> Dict:
+        return {
+            "startRow": offset,
+            "endRow": offset + limit,
+            "rowGroupCols": [],
+            "valueCols": [],
+            "pivotCols": [],
+            "pivotMode": False,
+            "groupKeys": [],
+            "filterModel": {},
+            "sortModel": []
+        }
 
-                    data = await resp.json()
-                    sellers = data.get("sellers") or data.get("data") or []
+    async def _fetch_seller_page(
+        self,
+        date: str,
+        offset: int,
+        limit: int,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        decode: Callable[[bytes], Any] | None = None,
+        executor: Executor | None = None,
+    ) -> Any:
+        """
+        Загружает одну страницу списка продавцов.
+        При ошибке повторяет запрос с экспоненциальной паузой, после max_retries попыток
+        бросает SellerListError — страница не должна пропадать молча.
+        С decode сырое тело ответа разбирается вызовом decode(body) в executor
+        (например, ProcessPoolExecutor), а не в потоке event loop; кэш при этом не используется.
+        """
+        if decode is None and (cached := await self._cache_get("seller/list", date, offset, limit)) is not None:
+            return cached
 
-                    if not sellers:
-                        logger.info("📭 Продавцы закончились.")
-                        break
+        url = f"{self.base_url}/api/seller/list?date={date}"
+        payload = self._seller_list_payload(offset, limit)
+        controller = self.controller
+        timeout = aiohttp.ClientTimeout(total=controller.request_timeout) if controller else None
 
-                    all_sellers.extend(sellers)
-                    offset += page_size
+        for attempt in range(1, max_retries + 1):
+            started = time.monotonic()
+            try:
+                async with self.session.post(url, json=payload, timeout=timeout) as resp:
+                    if resp.status == 200:
+                        if decode is not None:
+                            body = await resp.read()
+                            if controller:
+                                controller.on_success(time.monotonic() - started)
+                            return await asyncio.get_running_loop().run_in_executor(executor, decode, body)
+
+                        data = await resp.json()
+                        sellers = data.get("sellers") or data.get("data") or []
+                        if controller:
+                            controller.on_success(time.monotonic() - started)
+                        await self._cache_set("seller/list", sellers, date, offset, limit)
+                        return sellers
 
+                    text = await resp.text()
+                    reason = f"status_{resp.status}"
+                    if controller:
+                        controller.on_status(resp.status)
+                    logger.warning(
+                        f"⚠️ Ошибка {resp.status} при загрузке продавцов {offset}-{offset + limit} "
+                        f"(попытка {attempt}/{max_retries}): {text}"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                reason = "timeout"
+                if controller:
+                    controller.on_timeout()
+                logger.warning(
+                    f"⚠️ Таймаут при загрузке продавцов {offset}-{offset + limit} (попытка {attempt}/{max_retries})"
+                )
             except Exception as e:
-                logger.error(f"❌ Ошибка при получении продавцов: {e}")
-                break
+                reason = type(e).__name__
+                if controller:
+                    controller.on_error()
+                logger.warning(
+                    f"⚠️ Ошибка при загрузке продавцов {offset}-{offset + limit} "
+                    f"(попытка {attempt}/{max_retries}): {e}"
+                )
+
+            if attempt < max_retries:
+                delay = retry_delay * 2 ** (attempt - 1)
+                HTTP_RETRIES.inc(endpoint="/api/seller/list", reason=reason)
+                HTTP_BACKOFF_SECONDS.inc(delay, endpoint="/api/seller/list")
+                await asyncio.sleep(delay)
+
+        raise SellerListError(f"❌ Не удалось загрузить продавцов {offset}-{offset + limit} после {max_retries} попыток")
+
+    async def iter_seller_pages(
+        self,
+        date: str,
+        max_total: int | None = 907250,
+        page_size: int = 5000,
+        concurrency: int = 1,
+        max_retries: int = 3,
+        start_offset: int = 0,
+        checkpoint: CrawlCheckpoint | None = None,
+        decode: Callable[[bytes], Any] | None = None,
+        executor: Executor | None = None,
+        status: Dict | None = None,
+    ) -> AsyncIterator["SellerPage"]:
+        """
+        Асинхронно отдаёт страницы списка продавцов по мере их загрузки:
+
+            async for page in api.iter_seller_pages(date):
+                ...
+
+        Одновременно в работе держится до concurrency запросов, страницы отдаются
+        строго по порядку offset, так что в памяти находится не больше concurrency страниц.
+        Первая пустая страница означает конец данных. Неудачная страница перезапрашивается
+        отдельно; если она так и не загрузилась — бросается SellerListError.
+        Неполная страница (строк меньше запрошенного) допустима только последней: если за ней
+        идёт непустая, MPStats урезал страницу и строки между ними потеряны бы молча — тоже
+        SellerListError. next_offset страницы считается по фактическому числу строк, поэтому
+        продолжение с сохранённого прогресса начнётся с первой пропущенной строки.
+
+        Обход идёт до пустой страницы, но не дальше max_total строк (None — без предела).
+        Если передан словарь status, по окончании в нём будут reason — "end" (пустая
+        страница: список загружен целиком) или "max_total" (остановились на пределе, список
+        мог быть не полным) — и offset. Обход с checkpoint помечается завершённым только
+        при reason="end".
+        Если у API задан controller (AdaptiveController), concurrency и page_size берутся из него.
+
+        decode/executor переносят разбор ответа с event loop в пул (см. _fetch_seller_page):
+        тогда вместо SellerPage отдаётся результат decode — он должен поддерживать len()
+        и получает атрибуты offset и next_offset.
+
+        С checkpoint обход продолжается с сохранённого offset, а страница считается
+        обработанной, когда потребитель запросил следующую. Если потребитель копит
+        страницы (как refresh_from_api), он передаёт start_offset и сам сохраняет
+        прогресс по SellerPage.next_offset после записи.
+        """
+        if checkpoint is not None:
+            saved_offset, finished = await checkpoint.get_offset(SELLER_LIST_CRAWL, date)
+            if finished:
+                logger.info(f"⏭️ Список продавцов за {date} уже загружен целиком (чекпоинт)")
+                return
+            start_offset = max(start_offset, saved_offset)
+            if start_offset:
+                logger.info(f"⏯️ Продолжаем загрузку продавцов за {date} с offset {start_offset}")
+
+        await self.init_session()
+        controller = self.controller
+        # offset -> (задача, размер страницы); с controller размер у страниц может отличаться
+        pending: Dict[int, Tuple[asyncio.Task, int]] = {}
+        next_start = start_offset
+        done_offset, finished = start_offset, False
+        # (offset, получено строк, запрошено) последней неполной страницы
+        short_page: Tuple[int, int, int] | None = None
+
+        try:
+            while True:
+                limit = controller.concurrency if controller else concurrency
+                while len(pending) < limit and (max_total is None or next_start < max_total):
+                    size = controller.page_size if controller else page_size
+                    logger.info(f"📦 Загружаем продавцов {next_start}–{next_start + size}")
+                    task = asyncio.create_task(self._fetch_seller_page(
+                        date, next_start, size, max_retries=max_retries, decode=decode, executor=executor
+                    ))
+                    pending[next_start] = (task, size)
+                    next_start += size
+
+                if not pending:
+                    logger.warning(f"⚠️ Достигнут предел max_total={max_total} — список продавцов может быть неполным")
+                    reason = "max_total"
+                    break
+
+                offset = min(pending)
+                task, size = pending.pop(offset)
+                sellers = await task
+                if not sellers:
+                    logger.info("📭 Продавцы закончились.")
+                    finished = True
+                    reason = "end"
+                    break
+                if short_page is not None:
+                    short_offset, got, requested = short_page
+                    raise SellerListError(
+                        f"❌ MPStats вернул {got} из {requested} продавцов с offset {short_offset}, "
+                        f"но следующая страница не пуста — уменьшите page_size (max_page_size)"
+                    )
+                if len(sellers) < size:
+                    short_page = (offset, len(sellers), size)
+
+                if decode is None:
+                    page = SellerPage(sellers, offset, offset + len(sellers))
+                else:
+                    page = sellers
+                    page.offset, page.next_offset = offset, offset + len(sellers)
+                yield page
+                done_offset = page.next_offset
+                if checkpoint is not None:
+                    await checkpoint.save_offset(SELLER_LIST_CRAWL, date, done_offset)
+        finally:
+            # Страницы после конца данных (или после ошибки / остановки потребителя) больше не нужны
+            tasks = [task for task, _ in pending.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if status is not None:
+            status.update(reason=reason, offset=done_offset)
+        if checkpoint is not None and finished:
+            await checkpoint.save_offset(SELLER_LIST_CRAWL, date, done_offset, finished=True)
+
+    async def get_all_sellers_paginated(
+        self,
+        date: str,
+        max_total: int = 907250,
+        page_size: int = 5000,
+        concurrency: int = 1,
+        max_retries: int = 3,
+    ) -> List[Dict]:
+        """
+        Загружает весь список продавцов одним списком.
+        Для полного обхода маркетплейса лучше использовать iter_seller_pages —
+        он не держит в памяти все страницы сразу.
+        """
+        all_sellers = []
+        async for sellers in self.iter_seller_pages(
+            date, max_total=max_total, page_size=page_size, concurrency=concurrency, max_retries=max_retries
+        ):
+            all_sellers.extend(sellers)
 
         logger.info(f"✅ Всего загружено продавцов: {len(all_sellers)}")
         return all_sellers